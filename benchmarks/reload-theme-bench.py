@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""End-to-end reload-theme benchmark against a sandboxed HOME.
+
+Runs every stage of the pipeline for each image in backgrounds/ with stand-in
+wal, brew, pgrep, borders and sketchybar executables, so it works on a plain
+Linux box and measures reload-theme itself rather than the tools it drives.
+"""
+
+import argparse
+import contextlib
+import datetime
+import importlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Seconds each stand-in sleeps before doing its job
+DEFAULT_LATENCY = {
+    "wal": 0.25,
+    "brew": 1.0,
+    "pgrep": 0.002,
+    "borders": 0.01,
+    "sketchybar": 0.005,
+}
+
+FAKE_WAL = """\
+#!/usr/bin/env python3
+import hashlib, json, os, sys, time
+
+time.sleep(float(os.environ.get("FAKE_WAL_LATENCY", "0")))
+image = os.path.abspath(sys.argv[sys.argv.index("-i") + 1])
+with open(image, "rb") as f:
+    seed = hashlib.sha256(f.read()).hexdigest() * 2
+colors = {f"color{i}": "#" + seed[i * 6 : i * 6 + 6] for i in range(16)}
+cache = os.environ.get("PYWAL_CACHE_DIR") or os.path.expanduser("~/.cache/wal")
+os.makedirs(cache, exist_ok=True)
+with open(os.path.join(cache, "colors.json"), "w") as f:
+    json.dump(
+        {
+            "wallpaper": image,
+            "alpha": "100",
+            "special": {
+                "background": colors["color0"],
+                "foreground": colors["color15"],
+                "cursor": colors["color15"],
+            },
+            "colors": colors,
+        },
+        f,
+        indent=4,
+    )
+"""
+
+FAKE_BREW = """\
+#!/bin/sh
+sleep "$FAKE_BREW_LATENCY"
+# brew services restart <name>
+[ "$1" = "services" ] && touch "$FAKE_RUN_DIR/$3"
+exit 0
+"""
+
+FAKE_PGREP = """\
+#!/bin/sh
+sleep "$FAKE_PGREP_LATENCY"
+# pgrep -x <name>
+[ -e "$FAKE_RUN_DIR/$2" ]
+"""
+
+FAKE_RECORDER = """\
+#!/bin/sh
+sleep "$FAKE_{upper}_LATENCY"
+echo "$@" >> "$FAKE_RUN_DIR/{name}.log"
+"""
+
+VSCODE_SETTINGS = {
+    "editor.fontFamily": "Hack Nerd Font",
+    "editor.fontSize": 13,
+    "editor.minimap.enabled": False,
+    "files.exclude": {f"**/generated-{i}": True for i in range(200)},
+    "workbench.colorCustomizations": {},
+    "editor.tokenColorCustomizations": {},
+}
+
+ZED_SETTINGS = """\
+{
+  "theme": {
+    "mode": "system",
+    "light": "One Light",
+    "dark": "One Dark"
+  },
+  "vim_mode": false
+}
+"""
+
+
+def make_sandbox(root, latency):
+    """Build HOME and a bin dir of stand-ins under root; returns the env to run in."""
+    home = root / "home"
+    bin_dir = root / "bin"
+    run_dir = root / "run"
+    for directory in (bin_dir, run_dir, home / ".config" / "zed" / "themes"):
+        directory.mkdir(parents=True)
+
+    vscode_dir = home / "Library" / "Application Support" / "Code" / "User"
+    vscode_dir.mkdir(parents=True)
+    (vscode_dir / "settings.json").write_text(json.dumps(VSCODE_SETTINGS, indent=4))
+    (home / ".config" / "zed" / "settings.json").write_text(ZED_SETTINGS)
+
+    scripts = {
+        "wal": FAKE_WAL,
+        "brew": FAKE_BREW,
+        "pgrep": FAKE_PGREP,
+        "borders": FAKE_RECORDER.format(name="borders", upper="BORDERS"),
+        "sketchybar": FAKE_RECORDER.format(name="sketchybar", upper="SKETCHYBAR"),
+    }
+    for name, script in scripts.items():
+        path = bin_dir / name
+        path.write_text(script)
+        path.chmod(0o755)
+
+    # The bar is up from the start; borders only once brew has started it
+    (run_dir / "sketchybar").touch()
+
+    env = dict(
+        os.environ,
+        HOME=str(home),
+        PATH=f"{bin_dir}{os.pathsep}{os.environ['PATH']}",
+        FAKE_RUN_DIR=str(run_dir),
+    )
+    env.update(
+        (f"FAKE_{name.upper()}_LATENCY", str(seconds))
+        for name, seconds in latency.items()
+    )
+    return env
+
+
+def load_reload_theme():
+    """Import reload-theme's implementation; HOME must already point at the sandbox."""
+    sys.path.insert(0, str(REPO_DIR))
+    return importlib.import_module("reload_theme")
+
+
+def timed(samples, stage, func, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+    samples.setdefault(stage, []).append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def bench_image(rt, image, backend, samples):
+    from theme import Palette
+
+    timed(samples, "extract", rt.set_wallpaper, str(image), False, backend)
+    # The uncached run above stores nothing; fill the cache first so
+    # extract_cached always measures a hit
+    with contextlib.redirect_stdout(io.StringIO()):
+        rt.set_wallpaper(str(image), True, backend)
+    timed(samples, "extract_cached", rt.set_wallpaper, str(image), True, backend)
+    palette = timed(samples, "palette", Palette.load, rt.WAL_CACHE_DIR / "colors.json")
+    for target in rt.all_targets():
+        timed(samples, target.name, target.apply, palette)
+
+
+def bench_cli(image, backend, env, samples):
+    start = time.perf_counter()
+    subprocess.run(
+        [
+            sys.executable,
+            str(REPO_DIR / "reload-theme.py"),
+            "--no-cache",
+            "--backend",
+            backend,
+            str(image),
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    samples.setdefault("total", []).append((time.perf_counter() - start) * 1000)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        stage: {
+            "n": len(values),
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "max_ms": max(values),
+        }
+        for stage, values in samples.items()
+    }
+
+
+def print_summary(summary, baseline=None):
+    width = max(len(stage) for stage in summary)
+    header = f"  {'stage':<{width}}  {'p50 ms':>9}  {'p95 ms':>9}"
+    if baseline:
+        header += f"  {'p50 vs base':>11}"
+    print(header)
+    for stage, stats in summary.items():
+        line = f"  {stage:<{width}}  {stats['p50_ms']:9.2f}  {stats['p95_ms']:9.2f}"
+        base = baseline.get(stage) if baseline else None
+        if base:
+            change = (stats["p50_ms"] - base["p50_ms"]) / base["p50_ms"] * 100
+            line += f"  {change:+10.1f}%"
+        print(line)
+
+
+def regressions(summary, baseline, threshold):
+    """Stages whose p50 grew by more than threshold percent over the baseline."""
+    found = []
+    for stage, stats in summary.items():
+        base = baseline.get(stage)
+        if base and stats["p50_ms"] > base["p50_ms"] * (1 + threshold / 100):
+            found.append(stage)
+    return found
+
+
+def parse_latency(values):
+    latency = dict(DEFAULT_LATENCY)
+    for value in values:
+        name, _, seconds = value.partition("=")
+        if name not in latency:
+            raise SystemExit(
+                f"Unknown stand-in {name!r}, expected one of {list(latency)}"
+            )
+        latency[name] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--images",
+        type=Path,
+        default=REPO_DIR / "backgrounds",
+        help="directory of wallpapers to cycle through (default: backgrounds/)",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="runs per image")
+    parser.add_argument(
+        "--backend", choices=["native", "wal"], default="wal", help="palette backend"
+    )
+    parser.add_argument(
+        "--latency",
+        action="append",
+        default=[],
+        metavar="TOOL=SECONDS",
+        help="stand-in latency, e.g. --latency brew=2.5 (repeatable)",
+    )
+    parser.add_argument(
+        "--no-cli",
+        action="store_true",
+        help="skip the end-to-end runs of the reload-theme command",
+    )
+    parser.add_argument("--output", type=Path, help="where to write the JSON results")
+    parser.add_argument("--compare", type=Path, help="earlier results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="percent p50 slowdown that counts as a regression (default: 10)",
+    )
+    args = parser.parse_args()
+
+    latency = parse_latency(args.latency)
+    images = sorted(
+        path
+        for path in args.images.iterdir()
+        if path.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"}
+    )
+
+    with tempfile.TemporaryDirectory(prefix="reload-theme-bench-") as tmp_dir:
+        env = make_sandbox(Path(tmp_dir), latency)
+        os.environ.update(env)
+        rt = load_reload_theme()
+
+        samples = {}
+        start = time.perf_counter()
+        for run in range(args.runs):
+            for image in images:
+                bench_image(rt, image, args.backend, samples)
+                if not args.no_cli:
+                    bench_cli(image, args.backend, env, samples)
+            print(f"run {run + 1}/{args.runs} done")
+        elapsed = time.perf_counter() - start
+
+    summary = summarize(samples)
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["stages"]
+
+    print("")
+    print_summary(summary, baseline)
+    print(f"\n{len(images)} images x {args.runs} runs in {elapsed:.1f}s")
+
+    results = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "backend": args.backend,
+        "runs": args.runs,
+        "images": len(images),
+        "latency": latency,
+        "stages": summary,
+    }
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}.json"
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+    if baseline:
+        slower = regressions(summary, baseline, args.threshold)
+        if slower:
+            print(f"Regressions over {args.threshold:.0f}%: {', '.join(slower)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""The no-op check for a bare `reload-theme`, using nothing but os.
+
+reload-theme.py asks unchanged() before importing reload_theme, so a reload
+with nothing to do costs little more than interpreter startup. The
+fingerprint is a stat signature of everything a plain reload's output depends
+on, recorded by reload_theme after each successful reload. Besides the fixed
+list below, it covers the paths reload_theme passes to record(): every
+registered target's inputs, which unchanged() re-checks from the file itself.
+"""
+
+import os
+
+HOME = os.path.expanduser("~")
+REPO_DIR = os.path.dirname(os.path.realpath(__file__))
+
+COLORS_FILE = os.path.join(HOME, ".cache", "wal", "colors.json")
+FINGERPRINT_FILE = os.path.join(HOME, ".cache", "reload-theme", "reload.fingerprint")
+
+NOTHING_TO_DO = (
+    "Palette unchanged since the last reload, nothing to do (--force to redo)"
+)
+
+ZED_DIR = os.path.join(HOME, ".config", "zed")
+VSCODE_SETTINGS = os.path.join(
+    HOME, "Library", "Application Support", "Code", "User", "settings.json"
+)
+
+
+def _listing(directory, suffix=""):
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, name) for name in names if name.endswith(suffix)]
+
+
+def watched_paths():
+    theme_dir = os.path.join(REPO_DIR, "theme")
+    return [
+        COLORS_FILE,
+        os.path.join(REPO_DIR, "reload_theme.py"),
+        os.path.join(REPO_DIR, "reload-theme.py"),
+        os.path.join(REPO_DIR, "fastpath.py"),
+        os.path.join(REPO_DIR, "sketchybar", "colors.py"),
+        *_listing(theme_dir, ".py"),
+        *_listing(os.path.join(theme_dir, "templates")),
+        # Written by the editor targets, but also by Settings Sync or by hand
+        os.path.join(ZED_DIR, "themes", "pywal.json"),
+        os.path.join(ZED_DIR, "settings.json"),
+        VSCODE_SETTINGS,
+    ]
+
+
+def fingerprint(paths):
+    lines = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            lines.append(f"{path}\t-\t-")
+            continue
+        lines.append(f"{path}\t{stat.st_mtime_ns}\t{stat.st_size}")
+    return "\n".join(lines) + "\n"
+
+
+def unchanged():
+    """Whether a plain reload would reproduce what the last successful one wrote."""
+    try:
+        with open(FINGERPRINT_FILE) as f:
+            recorded = f.read()
+    except OSError:
+        return False
+    paths = [line.split("\t", 1)[0] for line in recorded.splitlines()]
+    # A file new to one of the listings isn't among the recorded paths
+    return set(watched_paths()) <= set(paths) and recorded == fingerprint(paths)
+
+
+def record(paths=()):
+    """Remember the current fingerprint of watched_paths() and paths.
+
+    Called after a reload in which every target that ran succeeded.
+    """
+    paths = list(dict.fromkeys([*watched_paths(), *map(str, paths)]))
+    os.makedirs(os.path.dirname(FINGERPRINT_FILE), exist_ok=True)
+    tmp = f"{FINGERPRINT_FILE}.{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(fingerprint(paths))
+    os.replace(tmp, FINGERPRINT_FILE)
@@ -0,0 +1,2127 @@
+"""reload-theme: regenerate pywal colors and re-theme editors, borders and bar.
+
+Run through the reload-theme.py entry point.
+"""
+
+# Only what every run needs (and what subprocess imports anyway) is imported
+# here; argparse, the theme package beyond trace, the daemon, precompute,
+# palette extraction and the target runner are imported where they're used,
+# so a no-op reload doesn't pay for them.
+import contextlib
+import json
+import os
+import select
+import selectors
+import signal
+import subprocess
+import sys
+import time
+import threading
+from pathlib import Path
+
+import fastpath
+from theme import trace
+
+REPO_DIR = Path(__file__).resolve().parent
+
+WAL_CACHE_DIR = Path.home() / ".cache" / "wal"
+WAL_OPTIONS = ["-s", "-t", "-n"]
+
+CACHE_DIR = Path.home() / ".cache" / "reload-theme"
+PALETTE_CACHE_DIR = CACHE_DIR / "palettes"
+PALETTE_CACHE_INDEX = PALETTE_CACHE_DIR / "index.json"
+PALETTE_CACHE_MAX_BYTES = 2 * 1024 * 1024
+PRECOMPUTE_INDEX = CACHE_DIR / "precompute.json"
+STATE_FILE = CACHE_DIR / "state.json"
+TOOLS_CACHE = CACHE_DIR / "tools.json"
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+# Generated files written vs. left alone because they already matched
+WRITE_STATS = {"written": 0, "skipped": 0}
+WRITE_STATS_LOCK = threading.Lock()
+
+
+def run_command(argv, **kwargs):
+    """subprocess.run, recorded as a span with its argv when tracing."""
+    if argv[0] in DISCOVERED_TOOLS:
+        argv = [find_tool(argv[0]) or argv[0], *argv[1:]]
+    with trace.span(Path(argv[0]).name, "subprocess", argv=[str(a) for a in argv]):
+        return subprocess.run(argv, **kwargs)
+
+
+def read_bytes(path):
+    with trace.span("read", "io", path=str(path)) as span:
+        data = Path(path).read_bytes()
+        span.set(bytes=len(data))
+        return data
+
+
+def read_text(path):
+    return read_bytes(path).decode()
+
+
+def atomic_write(path, content):
+    """Replace path via a temp file + rename so readers never see a partial file."""
+    with trace.span("write", "io", path=str(path), bytes=len(content)):
+        _atomic_write(Path(path).resolve(), content)
+
+
+def _atomic_write(path, content):
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+
+    import tempfile
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_if_changed(path, content):
+    """Atomically write content unless the file on disk already hashes the same.
+
+    Returns True if the file was written.
+    """
+    import hashlib
+
+    try:
+        current = hashlib.sha256(read_bytes(path)).digest()
+    except FileNotFoundError:
+        current = None
+
+    changed = current != hashlib.sha256(content.encode()).digest()
+    if changed:
+        atomic_write(path, content)
+
+    with WRITE_STATS_LOCK:
+        WRITE_STATS["written" if changed else "skipped"] += 1
+    return changed
+
+
+# Tools looked up once and remembered in TOOLS_CACHE, with the places to try
+# when they aren't on PATH (pip --user installs pywal outside of it on macOS)
+DISCOVERED_TOOLS = {
+    "wal": [
+        Path.home() / "Library" / "Python" / version / "bin" / "wal"
+        for version in ["3.14", "3.13", "3.12", "3.11", "3.10", "3.9"]
+    ],
+    "brew": [Path("/opt/homebrew/bin/brew"), Path("/usr/local/bin/brew")],
+    "sketchybar": [],
+    "borders": [],
+}
+
+TOOLS_LOCK = threading.Lock()
+_tools = None
+
+# Filled in as the run goes, for --profile-startup
+DISCOVERY_STATS = {"seconds": 0.0, "cached": 0, "resolved": 0}
+
+
+def resolve_tool(name):
+    import shutil
+
+    found = shutil.which(name)
+    if found:
+        return found
+    for candidate in DISCOVERED_TOOLS[name]:
+        if candidate.exists():
+            return str(candidate)
+    return None
+
+
+def find_tool(name):
+    """Absolute path of a tool, reused across runs while PATH and its mtime hold.
+
+    Returns None if it isn't installed.
+    """
+    global _tools
+    start = time.perf_counter()
+    path_env = os.environ.get("PATH", "")
+    with TOOLS_LOCK:
+        if _tools is None:
+            try:
+                with open(TOOLS_CACHE) as f:
+                    _tools = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                _tools = {}
+
+        entry = _tools.get(name)
+        found = None
+        if entry is not None and entry["PATH"] == path_env:
+            try:
+                if os.stat(entry["path"]).st_mtime_ns == entry["mtime_ns"]:
+                    found = entry["path"]
+            except OSError:
+                pass
+
+        if found is not None:
+            DISCOVERY_STATS["cached"] += 1
+        else:
+            found = resolve_tool(name)
+            DISCOVERY_STATS["resolved"] += 1
+            if found is not None:
+                _tools[name] = {
+                    "path": found,
+                    "mtime_ns": os.stat(found).st_mtime_ns,
+                    "PATH": path_env,
+                }
+                TOOLS_CACHE.parent.mkdir(parents=True, exist_ok=True)
+                atomic_write(TOOLS_CACHE, json.dumps(_tools, indent=2))
+        DISCOVERY_STATS["seconds"] += time.perf_counter() - start
+    return found
+
+
+def find_wal():
+    found = find_tool("wal")
+    if found:
+        return Path(found)
+    return DISCOVERED_TOOLS["wal"][0]
+
+
+def load_state():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+STATE_LOCK = threading.Lock()
+
+
+def update_state(**values):
+    """Merge values into the persisted state; safe to call from target threads."""
+    with STATE_LOCK:
+        state = load_state()
+        state.update(values)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        atomic_write(STATE_FILE, json.dumps(state, indent=2))
+
+
+def file_digest(path):
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backend_options(backend):
+    """Everything besides the image that shapes a backend's palette."""
+    if backend == "native":
+        from theme import extract
+
+        return [f"version={extract.VERSION}", f"sample={extract.SAMPLE_SIZE}"]
+    return WAL_OPTIONS
+
+
+def backend_chain(backend):
+    # The native extractor can't decode every format everywhere; pywal can
+    return ["native", "wal"] if backend == "native" else [backend]
+
+
+def palette_cache_key(image_digest, backend):
+    """Key a palette by image content plus everything that shapes extraction."""
+    import hashlib
+
+    material = "\0".join([image_digest, backend, *backend_options(backend)])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def load_cache_index():
+    try:
+        with open(PALETTE_CACHE_INDEX) as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        index = {}
+    index.setdefault("entries", {})
+    index.setdefault("hits", 0)
+    index.setdefault("misses", 0)
+    return index
+
+
+def save_cache_index(index):
+    PALETTE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    atomic_write(PALETTE_CACHE_INDEX, json.dumps(index, indent=2))
+
+
+def cache_lookup(index, key):
+    entry = index["entries"].get(key)
+    cache_file = PALETTE_CACHE_DIR / f"{key}.json"
+    if entry is None or not cache_file.exists():
+        index["entries"].pop(key, None)
+        index["misses"] += 1
+        return None
+
+    try:
+        with open(cache_file) as f:
+            wal_colors = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        index["entries"].pop(key, None)
+        index["misses"] += 1
+        return None
+
+    entry["last_used"] = time.time()
+    index["hits"] += 1
+    return wal_colors
+
+
+def cache_store(index, key, wal_colors, wallpaper):
+    PALETTE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    data = json.dumps(wal_colors, indent=4)
+    atomic_write(PALETTE_CACHE_DIR / f"{key}.json", data)
+    index["entries"][key] = {
+        "size": len(data),
+        "last_used": time.time(),
+        "wallpaper": str(wallpaper),
+    }
+    evict_cache(index)
+
+
+def evict_cache(index, max_bytes=PALETTE_CACHE_MAX_BYTES):
+    """Drop least recently used palettes until the cache fits in max_bytes."""
+    entries = index["entries"]
+    total = sum(entry["size"] for entry in entries.values())
+    by_age = sorted(entries, key=lambda key: entries[key]["last_used"])
+
+    for key in by_age:
+        if total <= max_bytes:
+            break
+        total -= entries.pop(key)["size"]
+        (PALETTE_CACHE_DIR / f"{key}.json").unlink(missing_ok=True)
+
+
+def write_wal_cache(wal_colors):
+    """Write colors.json and colors.sh the way pywal lays them out."""
+    WAL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for path, content in wal_cache_files(wal_colors).items():
+        atomic_write(path, content)
+
+
+def wal_cache_files(wal_colors):
+    special = wal_colors["special"]
+    lines = [
+        "# Shell variables",
+        "# Generated by 'wal'",
+        f"wallpaper='{wal_colors['wallpaper']}'",
+        "",
+        "# Special",
+        f"background='{special['background']}'",
+        f"foreground='{special['foreground']}'",
+        f"cursor='{special['cursor']}'",
+        "",
+        "# Colors",
+    ]
+    lines += [f"{name}='{value}'" for name, value in wal_colors["colors"].items()]
+    lines += [
+        "",
+        "# FZF colors",
+        'export FZF_DEFAULT_OPTS="',
+        "    $FZF_DEFAULT_OPTS",
+        "    --color fg:7,bg:0,hl:1,fg+:232,bg+:1,hl+:255",
+        "    --color info:7,prompt:2,spinner:1,pointer:232,marker:1",
+        '"',
+        "",
+        "# Fix LS_COLORS being unreadable.",
+        'export LS_COLORS="${LS_COLORS}:su=30;41:ow=30;42:st=30;44:"',
+    ]
+    return {
+        WAL_CACHE_DIR / "colors.json": json.dumps(wal_colors, indent=4),
+        WAL_CACHE_DIR / "colors.sh": "\n".join(lines) + "\n",
+    }
+
+
+class PaletteError(Exception):
+    pass
+
+
+@trace.traced
+def extract_palette(backend, image_path, cache_dir=None):
+    """Generate colors.json data for image_path with the given backend.
+
+    pywal writes into ~/.cache/wal unless cache_dir points it elsewhere. Raises
+    extract.UnsupportedImage when the native backend can't decode the image and
+    PaletteError when pywal fails.
+    """
+    if backend == "native":
+        from theme import extract
+
+        # Without pywal to fall back on, a slow pure-Python decode beats none
+        budget = extract.PURE_PYTHON_BUDGET if find_wal().exists() else None
+        return extract.extract_colors(image_path, budget=budget)
+
+    wal_path = find_wal()
+    env = None
+    wal_dir = WAL_CACHE_DIR
+    if cache_dir is not None:
+        wal_dir = Path(cache_dir) / "wal"
+        env = dict(
+            os.environ, XDG_CACHE_HOME=str(cache_dir), PYWAL_CACHE_DIR=str(wal_dir)
+        )
+
+    try:
+        run_command(
+            [str(wal_path), *WAL_OPTIONS, "-i", str(image_path)],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        with open(wal_dir / "colors.json") as f:
+            return json.load(f)
+    except subprocess.CalledProcessError as e:
+        raise PaletteError(f"Error running pywal: {e}") from e
+    except FileNotFoundError as e:
+        raise PaletteError(f"Error: pywal not found at {wal_path}") from e
+    except (OSError, json.JSONDecodeError) as e:
+        raise PaletteError(f"Error reading pywal colors: {e}") from e
+
+
+@trace.traced
+def find_palette(image, backend, index=None, cache_dir=None):
+    """wal colors for image from the first backend in backend's chain that works.
+
+    Each backend's palette is looked up in the cache index before extracting,
+    and what's extracted is stored there; index=None skips the cache. Returns
+    (wal_colors, backend used, whether it came from the cache) and raises
+    PaletteError when no backend can produce a palette.
+    """
+    from theme import extract
+
+    digest = None
+    for candidate in backend_chain(backend):
+        key = None
+        if index is not None:
+            key = precomputed_key(image, candidate)
+            if key is None:
+                digest = digest or file_digest(image)
+                key = palette_cache_key(digest, candidate)
+
+            wal_colors = cache_lookup(index, key)
+            if wal_colors is not None:
+                return wal_colors, candidate, True
+
+        try:
+            wal_colors = extract_palette(candidate, image, cache_dir=cache_dir)
+        except extract.UnsupportedImage as e:
+            print(f"Native extraction unavailable ({e}), falling back to pywal")
+            continue
+        if index is not None:
+            cache_store(index, key, wal_colors, image)
+        return wal_colors, candidate, False
+    raise PaletteError(f"No backend could extract a palette from {image}")
+
+
+def set_wallpaper(wallpaper_path, use_cache=True, backend="native"):
+    if not Path(wallpaper_path).exists():
+        print(f"Error: Wallpaper not found: {wallpaper_path}")
+        return False
+
+    print(f"Setting wallpaper: {wallpaper_path}")
+    index = load_cache_index() if use_cache else None
+    start = time.perf_counter()
+    try:
+        wal_colors, used, from_cache = find_palette(wallpaper_path, backend, index)
+    except PaletteError as e:
+        print(e)
+        return False
+    finally:
+        if use_cache:
+            save_cache_index(index)
+
+    if from_cache:
+        wal_colors["wallpaper"] = str(Path(wallpaper_path).resolve())
+        write_wal_cache(wal_colors)
+        print("Colors restored from cache")
+    else:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Colors generated with {used} backend in {elapsed_ms:.0f} ms")
+        # pywal has written ~/.cache/wal itself
+        if used == "native":
+            write_wal_cache(wal_colors)
+
+    if use_cache:
+        print(f"Palette cache: {index['hits']} hits, {index['misses']} misses")
+    return True
+
+
+def load_precompute_index():
+    try:
+        with open(PRECOMPUTE_INDEX) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def file_signature(path):
+    stat = Path(path).stat()
+    return {"mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def precomputed_key(wallpaper_path, backend):
+    """Cache key recorded by `precompute`, if the file is unchanged since then."""
+    path = Path(wallpaper_path).resolve()
+    entry = load_precompute_index().get(str(path))
+    if (
+        entry is None
+        or entry["backend"] != backend
+        or file_signature(path) != entry["signature"]
+    ):
+        return None
+    return entry["key"]
+
+
+def extract_palette_isolated(backend, image_path):
+    """Worker process entry: extract one palette, pywal in a private cache dir.
+
+    Returns (image_path, digest, backend used, wal_colors, error).
+    """
+    import tempfile
+
+    from theme import extract
+
+    digest = file_digest(image_path)
+    error = None
+    for candidate in backend_chain(backend):
+        with tempfile.TemporaryDirectory(prefix="reload-theme-") as tmp_dir:
+            try:
+                wal_colors = extract_palette(candidate, image_path, cache_dir=tmp_dir)
+                return image_path, digest, candidate, wal_colors, None
+            except (extract.UnsupportedImage, PaletteError) as e:
+                error = str(e)
+    return image_path, digest, backend, None, error
+
+
+def list_wallpapers(directory):
+    """Images directly in directory, sorted; None (after a message) if unreadable."""
+    try:
+        paths = list(Path(directory).iterdir())
+    except FileNotFoundError:
+        print(f"Error: {directory} does not exist")
+        return None
+    except NotADirectoryError:
+        print(f"Error: {directory} is not a directory")
+        return None
+    except OSError as e:
+        print(f"Error: could not read {directory}: {e.strerror}")
+        return None
+    return sorted(
+        path.resolve() for path in paths if path.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+def precompute(directory, jobs=None, backend="native"):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    images = list_wallpapers(directory)
+    if images is None:
+        return False
+    precompute_index = load_precompute_index()
+    cache_index = load_cache_index()
+
+    stale = []
+    for image in images:
+        entry = precompute_index.get(str(image))
+        if (
+            entry is not None
+            and entry["backend"] in backend_chain(backend)
+            and entry["signature"] == file_signature(image)
+            and entry["key"] in cache_index["entries"]
+        ):
+            continue
+        stale.append(image)
+
+    print(f"{len(images)} wallpapers, {len(stale)} need palettes")
+    if not stale:
+        return True
+
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(extract_palette_isolated, backend, image) for image in stale
+        ]
+        for future in as_completed(futures):
+            image, digest, used, wal_colors, error = future.result()
+            if wal_colors is None:
+                print(f"  {image.name}: failed ({error})")
+                failed += 1
+                continue
+
+            key = palette_cache_key(digest, used)
+            cache_store(cache_index, key, wal_colors, image)
+            precompute_index[str(image)] = {
+                "signature": file_signature(image),
+                "backend": used,
+                "key": key,
+            }
+            print(f"  {image.name}: done ({used})")
+
+    save_cache_index(cache_index)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    atomic_write(PRECOMPUTE_INDEX, json.dumps(precompute_index, indent=2))
+
+    elapsed = time.perf_counter() - start
+    print(f"Precomputed {len(stale) - failed} palettes in {elapsed:.1f}s")
+    return failed == 0
+
+
+def precompute_main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="reload-theme precompute",
+        description="Extract and cache palettes for every wallpaper in a directory.",
+    )
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default=REPO_DIR / "backgrounds",
+        help="directory of wallpapers (default: the repo's backgrounds/)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="worker processes (default: CPU count)"
+    )
+    add_backend_argument(parser)
+    args = parser.parse_args(argv)
+    return 0 if precompute(args.directory, args.jobs, args.backend) else 1
+
+
+# Gruvbox fallback, same as bordersrc
+BORDERS_FALLBACK = {
+    "active1": "0xfffbf1c7",
+    "active2": "0xffebdbb2",
+    "inactive": "0x40504945",
+}
+
+
+def borders_colors(palette):
+    """The gradient and inactive colors, as compiled into the theme artifact."""
+    if palette is None:
+        return BORDERS_FALLBACK
+    return {
+        "active1": palette.argb("color6"),
+        "active2": palette.argb("color4"),
+        "inactive": palette.argb("color0", alpha=0x40),
+    }
+
+
+def borders_args(palette):
+    """bordersrc's options, from the same values it reads out of theme.sh."""
+    return borders_options(borders_colors(palette))
+
+
+def borders_options(colors):
+    return [
+        "style=round",
+        "width=3.0",
+        "hidpi=on",
+        f"active_color=gradient(top_left={colors['active1']},"
+        f"bottom_right={colors['active2']})",
+        f"inactive_color={colors['inactive']}",
+    ]
+
+
+def is_running(process_name):
+    result = run_command(["pgrep", "-x", process_name], capture_output=True)
+    return result.returncode == 0
+
+
+@trace.traced
+def reload_borders(palette):
+    state = load_state()
+    restart_ms = state.get("borders_restart_ms")
+
+    if is_running("borders"):
+        # borders forwards arguments to the running instance instead of starting anew
+        print("Updating borders...")
+        start = time.perf_counter()
+        try:
+            run_command(
+                ["borders", *borders_args(palette)],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            print(f"Error updating borders: {e}")
+            return False
+
+        live_ms = (time.perf_counter() - start) * 1000
+        update_state(borders_live_ms=live_ms)
+        if restart_ms:
+            print(
+                f"Borders updated live in {live_ms:.0f} ms"
+                f" (a restart took {restart_ms:.0f} ms)"
+            )
+        else:
+            print(f"Borders updated live in {live_ms:.0f} ms")
+        return True
+
+    print("Borders not running, restarting service...")
+    start = time.perf_counter()
+    try:
+        run_command(
+            ["brew", "services", "restart", "borders"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Error reloading borders: {e}")
+        return False
+
+    restart_ms = (time.perf_counter() - start) * 1000
+    update_state(borders_restart_ms=restart_ms)
+    print(f"Borders restarted in {restart_ms:.0f} ms")
+    return True
+
+
+SKETCHYBAR_DIR = REPO_DIR / "sketchybar"
+SKETCHYBAR_ITEMS = [
+    *(f"space.{sid}" for sid in range(1, 8)),
+    "clock",
+    "volume",
+    "wifi",
+    "bluetooth",
+    "battery",
+]
+SKETCHYBAR_BRACKETS = ["spaces_bracket", "right_bracket"]
+
+
+def load_sketchybar_colors():
+    """Import sketchybar/colors.py so the bar and this script share one mapping."""
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(
+        "sketchybar_colors", SKETCHYBAR_DIR / "colors.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def sketchybar_properties(palette):
+    """Color properties sketchybarrc sets from colors.py, per --default/--set target."""
+    colors_module = load_sketchybar_colors()
+    if palette is None:
+        colors = colors_module.DEFAULTS
+    else:
+        colors = colors_module.colors_for(palette)
+
+    item_colors = {
+        "icon.color": colors["ICON_COLOR"],
+        "label.color": colors["LABEL_COLOR"],
+    }
+    properties = {"--default": item_colors}
+    properties.update((item, item_colors) for item in SKETCHYBAR_ITEMS)
+    properties.update(
+        (bracket, {"background.color": colors["ITEM_BG_COLOR"]})
+        for bracket in SKETCHYBAR_BRACKETS
+    )
+    return properties
+
+
+def sketchybar_structure():
+    """Fingerprint of the files that define the bar's layout."""
+    import hashlib
+
+    files = [SKETCHYBAR_DIR / "sketchybarrc", *sorted(SKETCHYBAR_DIR.glob("**/*.py"))]
+    digest = hashlib.sha256()
+    for path in files:
+        stat = path.stat()
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+def sketchybar_delta_args(old, new):
+    """One sketchybar argv carrying only the properties that changed."""
+    args = []
+    for target, properties in new.items():
+        changed = [
+            f"{prop}={value}"
+            for prop, value in properties.items()
+            if old.get(target, {}).get(prop) != value
+        ]
+        if not changed:
+            continue
+        if target == "--default":
+            args += ["--default", *changed]
+        else:
+            args += ["--set", target, *changed]
+    return args
+
+
+@trace.traced
+def reload_sketchybar(palette):
+    if not is_running("sketchybar"):
+        print("Sketchybar not running, skipping")
+        return False
+
+    state = load_state()
+    structure = sketchybar_structure()
+    properties = sketchybar_properties(palette)
+
+    if state.get("sketchybar_structure") == structure:
+        args = sketchybar_delta_args(state.get("sketchybar_properties", {}), properties)
+        if not args:
+            print("Sketchybar colors unchanged")
+            return True
+
+        print("Updating sketchybar colors...")
+        try:
+            run_command(
+                ["sketchybar", *args], check=True, capture_output=True, text=True
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"Error updating sketchybar: {e}")
+            return False
+
+        update_state(sketchybar_properties=properties)
+        print("Sketchybar colors updated")
+        return True
+
+    # First run or sketchybarrc/plugins changed: re-run the whole config
+    print("Reloading sketchybar...")
+    try:
+        run_command(
+            ["sketchybar", "--reload"], check=True, capture_output=True, text=True
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Error reloading sketchybar: {e}")
+        return False
+
+    update_state(sketchybar_structure=structure, sketchybar_properties=properties)
+    print("Sketchybar reloaded")
+    return True
+
+
+# Transitions
+
+
+def parse_argb(value):
+    """Split "0xff1e3a5f" into (0xff, 0x1e, 0x3a, 0x5f)."""
+    number = int(value, 16)
+    return tuple((number >> shift) & 0xFF for shift in (24, 16, 8, 0))
+
+
+def blend_argb(old, new, ratio):
+    """ARGB strings blended channel by channel, alpha included."""
+    from theme.palette import blend
+
+    return "0x{:02x}{:02x}{:02x}{:02x}".format(
+        *blend(parse_argb(old), parse_argb(new), ratio)
+    )
+
+
+def ease(t):
+    """Smoothstep, so colors settle instead of stopping abruptly."""
+    return t * t * (3 - 2 * t)
+
+
+def transition_frame(old, new, ratio):
+    """Blend two {target: {property: argb}} maps; targets only in new are kept."""
+    return {
+        target: {
+            prop: blend_argb(old.get(target, {}).get(prop, value), value, ratio)
+            for prop, value in properties.items()
+        }
+        for target, properties in new.items()
+    }
+
+
+@trace.traced
+def animate_transition(old_palette, new_palette, frames, fps):
+    """Fade SketchyBar and borders from old_palette to new_palette.
+
+    Every frame goes out as one sketchybar and one borders call, started
+    together. When a frame runs over its 1/fps budget, the frames whose time
+    has already passed are dropped so the fade still ends on schedule.
+    """
+    live = {"sketchybar": is_running("sketchybar"), "borders": is_running("borders")}
+    if not any(live.values()) or frames < 1:
+        return False
+
+    old = {"borders": borders_colors(old_palette)}
+    new = {"borders": borders_colors(new_palette)}
+    if live["sketchybar"]:
+        old.update(sketchybar_properties(old_palette))
+        new.update(sketchybar_properties(new_palette))
+
+    print(f"Fading colors over {frames} frames at {fps:g} fps...")
+    sent = dropped = 0
+    shown = old
+    start = time.perf_counter()
+    frame = 0
+    last_started = start
+    while frame < frames:
+        delay = start + frame / fps - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        # Skip straight to the newest frame that is already due
+        due = min(frames - 1, int((time.perf_counter() - start) * fps))
+        if due > frame:
+            dropped += due - frame
+            frame = due
+
+        last_started = time.perf_counter()
+        with trace.span("frame", frame=frame):
+            current = transition_frame(old, new, ease((frame + 1) / frames))
+            push_frame(shown, current, live)
+        shown = current
+        sent += 1
+        frame += 1
+
+    elapsed = time.perf_counter() - start
+    # n frames span n - 1 intervals, counted between the frames' start times
+    span = last_started - start
+    achieved = f"{(sent - 1) / span:.1f}" if sent > 1 and span > 0 else "-"
+    print(
+        f"Transition: {sent} frames sent, {dropped} dropped,"
+        f" {achieved} fps achieved (target {fps:g}) in {elapsed * 1000:.0f} ms"
+    )
+    if live["sketchybar"]:
+        # The bar already shows the final colors; don't send them again
+        del shown["borders"]
+        update_state(sketchybar_properties=shown)
+    return True
+
+
+def push_frame(shown, current, live):
+    """Start the frame's sketchybar and borders updates together, then wait for both."""
+    processes = []
+    if live["borders"]:
+        argv = [find_tool("borders") or "borders", *borders_options(current["borders"])]
+        processes.append(subprocess.Popen(argv, stdout=subprocess.DEVNULL))
+    if live["sketchybar"]:
+        bar = {
+            target: props for target, props in current.items() if target != "borders"
+        }
+        args = sketchybar_delta_args(shown, bar)
+        if args:
+            argv = [find_tool("sketchybar") or "sketchybar", *args]
+            processes.append(subprocess.Popen(argv, stdout=subprocess.DEVNULL))
+    for process in processes:
+        process.wait()
+
+
+ZED_DIR = Path(fastpath.ZED_DIR)
+VSCODE_SETTINGS = Path(fastpath.VSCODE_SETTINGS)
+
+
+def zed_files(palette):
+    """Zed's theme file and patched settings.json contents, by path."""
+    from theme import load_template
+
+    files = {
+        ZED_DIR / "themes" / "pywal.json": load_template("zed").render(palette.hex)
+    }
+    settings_file = ZED_DIR / "settings.json"
+    if settings_file.exists():
+        files[settings_file] = zed_settings_with_theme(read_text(settings_file))
+    return files
+
+
+@trace.traced
+def update_zed_theme(palette):
+    if palette is None:
+        print("Pywal colors not found, skipping Zed update")
+        return False
+
+    if not (ZED_DIR / "themes").exists():
+        print("Zed themes directory not found, skipping Zed update")
+        return False
+
+    print("Updating Zed theme...")
+    try:
+        for path, content in zed_files(palette).items():
+            write_if_changed(path, content)
+
+        print("Zed theme updated")
+        return True
+    except Exception as e:
+        print(f"Error updating Zed theme: {e}")
+        return False
+
+
+ZED_THEME = {"mode": "system", "light": "Ayu Light", "dark": "Pywal"}
+
+
+def zed_settings_with_theme(content):
+    """Point Zed's dark theme at Pywal, keeping the user's mode and light theme."""
+    from theme import jsonc
+
+    depth, start, end, _ = jsonc.locate(content, ["theme", "dark"])
+    if depth == 0 or (depth == 1 and end > start):
+        # No theme yet, or a single theme name: switch to a light/dark pair
+        theme = json.dumps(ZED_THEME, indent=jsonc.indent_unit(content))
+        return jsonc.set_value(content, ["theme"], theme)
+    return jsonc.set_value(content, ["theme", "dark"], json.dumps("Pywal"))
+
+
+def vscode_files(palette):
+    """VSCode's settings.json with the two color keys re-rendered, by path."""
+    from theme import jsonc, load_template
+
+    # settings.json is JSONC; only the two values we own are rewritten
+    content = read_text(VSCODE_SETTINGS)
+    for key, template in [
+        ("workbench.colorCustomizations", "vscode-colors"),
+        ("editor.tokenColorCustomizations", "vscode-tokens"),
+    ]:
+        content = jsonc.set_value(
+            content, [key], load_template(template).render(palette.hex)
+        )
+    return {VSCODE_SETTINGS: content}
+
+
+@trace.traced
+def update_vscode_settings(palette):
+    if palette is None:
+        print("Pywal colors not found, skipping VSCode update")
+        return False
+
+    if not VSCODE_SETTINGS.exists():
+        print("VSCode settings not found, skipping VSCode update")
+        return False
+
+    print("Updating VSCode settings...")
+    try:
+        for path, content in vscode_files(palette).items():
+            write_if_changed(path, content)
+
+        print("VSCode settings updated")
+        return True
+    except Exception as e:
+        print(f"Error updating VSCode settings: {e}")
+        return False
+
+
+@trace.traced
+def write_theme_artifact(palette, colors_file=WAL_CACHE_DIR / "colors.json"):
+    """Compile theme.json/theme.sh for colors.py and bordersrc, or remove them."""
+    from theme import artifact
+
+    if palette is None:
+        artifact.ARTIFACT_FILE.unlink(missing_ok=True)
+        artifact.SHELL_FILE.unlink(missing_ok=True)
+        return
+
+    consumers = {
+        "sketchybar": load_sketchybar_colors().colors_for(palette),
+        "borders": borders_colors(palette),
+    }
+    compiled = artifact.build(palette, colors_file.stat().st_mtime_ns, consumers)
+    artifact.ARTIFACT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    # theme.sh first: a reader that sees the new theme.json also sees its shell form
+    write_if_changed(artifact.SHELL_FILE, artifact.to_shell(compiled))
+    write_if_changed(artifact.ARTIFACT_FILE, artifact.to_json(compiled))
+
+
+class WholeLines:
+    """stdout shared by target threads, written a whole line at a time.
+
+    print() writes the text and the newline separately, so two targets
+    printing at once could run their messages together on one line. Each
+    thread's output is held until it ends a line.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.partial = {}
+
+    def write(self, text):
+        thread = threading.get_ident()
+        lines, newline, rest = (self.partial.pop(thread, "") + text).rpartition("\n")
+        if newline:
+            with self.lock:
+                self.stream.write(lines + newline)
+                self.stream.flush()
+        if rest:
+            self.partial[thread] = rest
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Write out lines left unfinished."""
+        with self.lock:
+            for rest in self.partial.values():
+                self.stream.write(rest + "\n")
+            self.partial.clear()
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def run_targets(targets, palette):
+    """Run targets concurrently, starting each once its `after` targets finished.
+
+    Every target is called with the shared Palette (None if pywal colors are missing).
+
+    Returns a dict of name -> (ok, seconds) in the order targets were given.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    results = {}
+    pending = list(targets)
+    names = {target.name for target in targets}
+    running = {}
+
+    stdout = WholeLines(sys.stdout)
+    workers = len(targets) or 1
+    with contextlib.redirect_stdout(stdout), ThreadPoolExecutor(workers) as pool:
+        while pending or running:
+            for target in list(pending):
+                # Targets outside this batch (unchanged, or not selected) count as done
+                if all(dep in results or dep not in names for dep in target.after):
+                    pending.remove(target)
+                    future = pool.submit(timed_call, target.apply, palette)
+                    running[future] = target.name
+
+            if not running:
+                # Circular dependencies, report them instead of hanging
+                for target in pending:
+                    print(f"Error: {target.name} waits on {', '.join(target.after)}")
+                    results[target.name] = (False, 0.0)
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    stdout.close()
+
+    return {target.name: results[target.name] for target in targets}
+
+
+def timed_call(func, *args):
+    start = time.perf_counter()
+    try:
+        ok = bool(func(*args))
+    except Exception as e:
+        print(f"Error in {func.__name__}: {e}")
+        ok = False
+    return ok, time.perf_counter() - start
+
+
+def print_timings(results, wall_time, unchanged=()):
+    print("")
+    if unchanged:
+        print(f"  unchanged since the last reload: {', '.join(unchanged)}")
+    if not results:
+        return
+    width = max(len(name) for name in results)
+    for name, (ok, seconds) in results.items():
+        status = "ok" if ok else "skipped/failed"
+        print(f"  {name:<{width}}  {seconds * 1000:8.1f} ms  {status}")
+
+    sequential = sum(seconds for _, seconds in results.values())
+    print(
+        f"  {'total':<{width}}  {wall_time * 1000:8.1f} ms"
+        f"  (sequential: {sequential * 1000:.1f} ms)"
+    )
+    print(
+        f"  files: {WRITE_STATS['written']} written,"
+        f" {WRITE_STATS['skipped']} unchanged"
+    )
+
+
+class Target:
+    """Something themed from the palette, and everything its output depends on.
+
+    tokens is the set of palette tokens apply(palette) reads, or a function
+    returning it (for targets whose tokens come from templates). Targets that
+    map the palette through code instead pass output, a function computing
+    what apply(palette) sends, which is fingerprinted in place of the tokens.
+    inputs returns files whose changes should re-run the target too, and
+    after names targets that must finish first. requires is a path the app
+    must have for the target to apply; without it the target skips itself.
+    """
+
+    def __init__(
+        self,
+        name,
+        apply,
+        tokens=(),
+        inputs=None,
+        after=(),
+        output=None,
+        requires=None,
+    ):
+        self.name = name
+        self.apply = apply
+        self._tokens = tokens
+        self.output = output
+        self.inputs = inputs or (lambda: [])
+        self.after = tuple(after)
+        self.requires = requires
+
+    def installed(self):
+        return self.requires is None or self.requires.exists()
+
+    @property
+    def tokens(self):
+        if callable(self._tokens):
+            self._tokens = frozenset(self._tokens())
+        return self._tokens
+
+    def fingerprint(self, palette):
+        import hashlib
+
+        digest = hashlib.sha256()
+        if self.output is not None:
+            digest.update(json.dumps(self.output(palette), sort_keys=True).encode())
+        for token in sorted(self.tokens):
+            digest.update(f"{token}={palette.hex.get(token)}\n".encode())
+        for path in self.inputs():
+            digest.update(f"{path}:{file_state(path)}\n".encode())
+        return digest.hexdigest()
+
+
+TARGETS = {}
+
+
+def register_target(target):
+    TARGETS[target.name] = target
+    return target
+
+
+def template_files(*names, outputs=()):
+    """Inputs of a template target: its templates plus the files it writes.
+
+    Watching the outputs re-runs the target when something else rewrites or
+    deletes them (Settings Sync, a manual edit).
+    """
+
+    def inputs():
+        from theme.template import TEMPLATE_DIR
+
+        return [*(TEMPLATE_DIR / f"{name}.json" for name in names), *outputs]
+
+    return inputs
+
+
+def template_slots(*names):
+    """Tokens of a template target: every slot in its templates."""
+
+    def tokens():
+        from theme import load_template
+
+        return set().union(*(load_template(name).slots for name in names))
+
+    return tokens
+
+
+register_target(
+    Target(
+        "zed",
+        update_zed_theme,
+        template_slots("zed"),
+        inputs=template_files(
+            "zed",
+            outputs=(ZED_DIR / "themes" / "pywal.json", ZED_DIR / "settings.json"),
+        ),
+        requires=ZED_DIR / "themes",
+    )
+)
+register_target(
+    Target(
+        "vscode",
+        update_vscode_settings,
+        template_slots("vscode-colors", "vscode-tokens"),
+        inputs=template_files(
+            "vscode-colors", "vscode-tokens", outputs=(VSCODE_SETTINGS,)
+        ),
+        requires=VSCODE_SETTINGS,
+    )
+)
+# Fingerprinted by what they send, so editing borders_colors() or colors_for()
+# re-runs them like a palette change does
+register_target(Target("borders", reload_borders, output=borders_args))
+register_target(
+    Target(
+        "sketchybar",
+        reload_sketchybar,
+        output=sketchybar_properties,
+        inputs=lambda: [
+            SKETCHYBAR_DIR / "sketchybarrc",
+            *sorted(SKETCHYBAR_DIR.glob("**/*.py")),
+        ],
+    )
+)
+
+USER_TARGETS_DIR = Path.home() / ".config" / "reload-theme" / "targets"
+_user_targets_loaded = False
+
+
+def load_user_target(path):
+    """A target from a file defining TOKENS and apply(palette), optionally AFTER."""
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(
+        f"reload_theme_target_{path.stem}", path
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return Target(
+        path.stem,
+        module.apply,
+        set(module.TOKENS),
+        inputs=lambda: [path],
+        after=getattr(module, "AFTER", ()),
+    )
+
+
+def all_targets():
+    """Built-in targets plus the ones in ~/.config/reload-theme/targets, loaded once."""
+    global _user_targets_loaded
+    if not _user_targets_loaded:
+        _user_targets_loaded = True
+        for path in sorted(USER_TARGETS_DIR.glob("*.py")):
+            try:
+                register_target(load_user_target(path))
+            except Exception as e:
+                print(f"Error loading target {path}: {e}")
+    return list(TARGETS.values())
+
+
+def record_no_op():
+    """Record the no-op fingerprint over everything the targets depend on.
+
+    fastpath.py can't load the targets itself, so it's handed their inputs and
+    the directories new targets and SketchyBar plugins appear in.
+    """
+    inputs = [path for target in all_targets() for path in target.inputs()]
+    # Installing one of the apps makes its skipped target worth running
+    required = [target.requires for target in all_targets() if target.requires]
+    directories = [USER_TARGETS_DIR, *SKETCHYBAR_DIR.glob("**")]
+    fastpath.record([*inputs, *required, *directories])
+
+
+def fully_applied(results):
+    """Whether every target that ran succeeded or had no app to theme.
+
+    A target that failed otherwise (say, SketchyBar wasn't running) has to run
+    again on the next reload, so the no-op isn't recorded.
+    """
+    return all(ok or not TARGETS[name].installed() for name, (ok, _) in results.items())
+
+
+def store_fingerprints(targets, palette):
+    """Remember targets as up to date with palette.
+
+    Taken after the targets ran, since they rewrite files among their inputs.
+    """
+    fingerprints = {target.name: target.fingerprint(palette) for target in targets}
+    if fingerprints:
+        previous = load_state().get("target_fingerprints", {})
+        update_state(target_fingerprints={**previous, **fingerprints})
+
+
+def apply_targets(targets, palette, force=False):
+    """Run the targets whose fingerprint changed since they last succeeded.
+
+    Returns run_targets' results and the names of the targets left alone.
+    """
+    fingerprints = {}
+    if palette is not None:
+        fingerprints = {target.name: target.fingerprint(palette) for target in targets}
+    stored = {} if force else load_state().get("target_fingerprints", {})
+    stale = [
+        target
+        for target in targets
+        if not fingerprints or stored.get(target.name) != fingerprints[target.name]
+    ]
+
+    results = run_targets(stale, palette) if stale else {}
+    # Without a palette nothing was fingerprinted and nothing is recorded
+    if fingerprints:
+        store_fingerprints(
+            [target for target in stale if results.get(target.name, (False,))[0]],
+            palette,
+        )
+    unchanged = [target.name for target in targets if target not in stale]
+    return results, unchanged
+
+
+# Rotation
+
+
+def parse_times(value):
+    """Parse "08:00,13:30" into [(8, 0), (13, 30)], sorted."""
+    times = []
+    for part in value.split(","):
+        hours, _, minutes = part.strip().partition(":")
+        hour, minute = int(hours), int(minutes or 0)
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            import argparse
+
+            raise argparse.ArgumentTypeError(f"not a time of day: {part!r}")
+        times.append((hour, minute))
+    return sorted(times)
+
+
+def next_switch(now, every=None, times=None):
+    """Epoch seconds of the next switch after now, every N minutes or at set times."""
+    if times is None:
+        return now + every * 60
+
+    import datetime
+
+    current = datetime.datetime.fromtimestamp(now)
+    for day in (0, 1):
+        date = current.date() + datetime.timedelta(days=day)
+        for hour, minute in times:
+            moment = datetime.datetime.combine(date, datetime.time(hour, minute))
+            if moment > current:
+                return moment.timestamp()
+
+
+def rotation_order(images, shuffle, current=None):
+    """Endless wallpaper sequence: the directory in order after current, or shuffled."""
+    import random
+
+    if not shuffle:
+        start = images.index(current) + 1 if current in images else 0
+        while True:
+            yield from images[start:] + images[:start]
+            start = 0
+
+    previous = current
+    while True:
+        cycle = random.sample(images, len(images))
+        if len(cycle) > 1 and cycle[0] == previous:
+            cycle.append(cycle.pop(0))
+        yield from cycle
+        previous = cycle[-1]
+
+
+def cached_palette(image, backend):
+    """Palette for image from the cache, or extracted without touching ~/.cache/wal."""
+    import tempfile
+
+    index = load_cache_index()
+    try:
+        with tempfile.TemporaryDirectory(prefix="reload-theme-") as tmp_dir:
+            return find_palette(image, backend, index, cache_dir=tmp_dir)[0]
+    finally:
+        save_cache_index(index)
+
+
+class PreparedWallpaper:
+    """A wallpaper's palette and rendered files, ready to be swapped in."""
+
+    # Files rendered from settings the user may edit before the switch
+    RENDERS = {"zed": zed_files, "vscode": vscode_files}
+
+    def __init__(self, image, backend):
+        self.image = image
+        wal_colors = cached_palette(image, backend)
+        wal_colors["wallpaper"] = str(image)
+        from theme import Palette
+
+        self.palette = Palette(wal_colors)
+        self.files = wal_cache_files(wal_colors)
+        self.inputs = {}
+        self.render("zed", ZED_DIR / "themes", ZED_DIR / "settings.json")
+        self.render("vscode", VSCODE_SETTINGS, VSCODE_SETTINGS)
+
+    def render(self, name, required, source):
+        if required.exists():
+            self.files.update(self.RENDERS[name](self.palette))
+            self.inputs[name] = (required, source, file_state(source))
+
+    def swap_in(self):
+        """Write every file atomically; re-render the ones whose source changed."""
+        for name, (required, source, state) in self.inputs.items():
+            if file_state(source) != state:
+                self.render(name, required, source)
+
+        # colors.json last, so anything watching it sees the other files first
+        files = sorted(self.files.items(), key=lambda f: f[0].parent == WAL_CACHE_DIR)
+        for path, content in files:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_if_changed(path, content)
+        write_theme_artifact(self.palette)
+
+
+def set_desktop_picture(image):
+    """Show image on every desktop (macOS); False where osascript isn't available."""
+    script = (
+        'tell application "System Events" to tell every desktop'
+        f" to set picture to {json.dumps(str(image))}"
+    )
+    try:
+        run_command(["osascript", "-e", script], check=True, capture_output=True)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Could not set the desktop picture: {e}")
+        return False
+    return True
+
+
+def rotate(
+    directory,
+    every=None,
+    times=None,
+    shuffle=False,
+    backend="native",
+    count=None,
+    transition=(0, 30.0),
+):
+    """Switch wallpapers on a schedule, preparing each one while the last is shown."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    images = list_wallpapers(directory)
+    if images is None:
+        return False
+    if not images:
+        print(f"No wallpapers in {directory}")
+        return False
+
+    from theme import Palette
+
+    shown = Palette.load(WAL_CACHE_DIR / "colors.json")
+    current = Path(shown.wal["wallpaper"]) if shown is not None else None
+    order = rotation_order(images, shuffle, current)
+    if times is None:
+        schedule = f"every {every:g} min"
+    else:
+        schedule = "at " + ", ".join(
+            f"{hour:02d}:{minute:02d}" for hour, minute in times
+        )
+    if shuffle:
+        schedule += ", shuffled"
+    print(f"Rotating {len(images)} wallpapers {schedule}")
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    # Applied at the switch; the editors are already rendered by PreparedWallpaper
+    push = [
+        target
+        for target in all_targets()
+        if target.name not in PreparedWallpaper.RENDERS
+    ]
+    switches = 0
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") as prefetch:
+
+        def prepare_next():
+            image = next(order)
+            return image, prefetch.submit(PreparedWallpaper, image, backend)
+
+        image, upcoming = prepare_next()
+        try:
+            while count is None or switches < count:
+                due = next_switch(time.time(), every, times)
+                at = time.strftime("%H:%M:%S", time.localtime(due))
+                print(f"Next: {image.name} at {at}")
+                if stopped.wait(max(0.0, due - time.time())):
+                    break
+
+                try:
+                    prepared = upcoming.result()
+                except (PaletteError, OSError, ValueError) as e:
+                    print(f"Skipping {image.name}: {e}")
+                    image, upcoming = prepare_next()
+                    continue
+                # The one after this is prepared while this one is shown
+                image, upcoming = prepare_next()
+
+                start = time.perf_counter()
+                with WRITE_STATS_LOCK:
+                    WRITE_STATS.update(written=0, skipped=0)
+                prepared.swap_in()
+                set_desktop_picture(prepared.image)
+                if transition[0]:
+                    animate_transition(shown, prepared.palette, *transition)
+                shown = prepared.palette
+                # swap_in wrote the editors' files, so they're as good as applied
+                store_fingerprints(
+                    [TARGETS[name] for name in prepared.inputs], prepared.palette
+                )
+                results, unchanged = apply_targets(push, prepared.palette)
+                print(f"Switched to {prepared.image.name}")
+                print_timings(results, time.perf_counter() - start, unchanged)
+                if fully_applied(results):
+                    record_no_op()
+                switches += 1
+        except KeyboardInterrupt:
+            pass
+        finally:
+            upcoming.cancel()
+    return True
+
+
+def rotate_main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="reload-theme rotate",
+        description="Cycle through a directory of wallpapers on a schedule.",
+    )
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default=REPO_DIR / "backgrounds",
+        help="directory of wallpapers (default: the repo's backgrounds/)",
+    )
+    schedule = parser.add_mutually_exclusive_group()
+    schedule.add_argument(
+        "--every",
+        type=float,
+        metavar="MINUTES",
+        help="switch every MINUTES (default: 60)",
+    )
+    schedule.add_argument(
+        "--at",
+        type=parse_times,
+        metavar="HH:MM,...",
+        help="switch at these times of day instead",
+    )
+    parser.add_argument("--shuffle", action="store_true", help="random order")
+    parser.add_argument("--count", type=int, help="stop after this many switches")
+    add_backend_argument(parser)
+    add_transition_arguments(parser)
+    args = parser.parse_args(argv)
+
+    every = args.every if args.every is not None or args.at is not None else 60.0
+    ok = rotate(
+        args.directory,
+        every,
+        args.at,
+        args.shuffle,
+        args.backend,
+        args.count,
+        (args.transition, args.fps),
+    )
+    return 0 if ok else 1
+
+
+DAEMON_SOCKET = CACHE_DIR / "daemon.sock"
+DAEMON_POLL_INTERVAL = 1.0
+# pywal writes several files back to back; wait for the burst to settle
+DAEMON_DEBOUNCE = 0.05
+# How long a client gets to send its command; the daemon has one thread
+DAEMON_REQUEST_TIMEOUT = 1.0
+
+
+def file_state(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class PollingWatcher:
+    """Stat-polls a file; used where no native change notification is available."""
+
+    timeout = DAEMON_POLL_INTERVAL
+
+    def __init__(self, path):
+        self.path = path
+
+    def fileno(self):
+        return None
+
+    def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify on the file's directory, so atomic replaces are seen too."""
+
+    timeout = None
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+
+    def __init__(self, path):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = (
+            self.IN_MODIFY
+            | self.IN_CLOSE_WRITE
+            | self.IN_MOVED_TO
+            | self.IN_CREATE
+            | self.IN_DELETE
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if libc.inotify_add_watch(self.fd, bytes(path.parent), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def fileno(self):
+        return self.fd
+
+    def drain(self):
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+class KqueueWatcher:
+    """macOS kqueue on the directory (replaces) and the file itself (rewrites)."""
+
+    timeout = None
+
+    def __init__(self, path):
+        self.path = path
+        self.kq = select.kqueue()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.dir_fd = self.watch(path.parent)
+        self.file_fd = None
+        self.watch_file()
+
+    def watch(self, path):
+        fd = os.open(path, getattr(os, "O_EVTONLY", 0x8000))
+        flags = (
+            select.KQ_NOTE_WRITE
+            | select.KQ_NOTE_EXTEND
+            | select.KQ_NOTE_DELETE
+            | select.KQ_NOTE_RENAME
+        )
+        event = select.kevent(
+            fd,
+            filter=select.KQ_FILTER_VNODE,
+            flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+            fflags=flags,
+        )
+        self.kq.control([event], 0, 0)
+        return fd
+
+    def watch_file(self):
+        # The fd pins the inode; closing it also drops its kevent
+        if self.file_fd is not None:
+            os.close(self.file_fd)
+            self.file_fd = None
+        try:
+            self.file_fd = self.watch(self.path)
+        except FileNotFoundError:
+            pass
+
+    def fileno(self):
+        return self.kq.fileno()
+
+    def drain(self):
+        self.kq.control(None, 64, 0)
+        self.watch_file()
+
+    def close(self):
+        self.watch_file()
+        if self.file_fd is not None:
+            os.close(self.file_fd)
+        os.close(self.dir_fd)
+        self.kq.close()
+
+
+def make_watcher(path):
+    for watcher in (InotifyWatcher, KqueueWatcher):
+        try:
+            return watcher(path)
+        except (OSError, AttributeError, TypeError):
+            continue
+    return PollingWatcher(path)
+
+
+class ThemeDaemon:
+    """Keeps the palette and templates in memory and re-renders on change.
+
+    Watches ~/.cache/wal/colors.json and listens on a Unix socket for
+    `reload [target ...]`, `wallpaper PATH`, `status` and `stop`.
+    """
+
+    def __init__(self, backend="native"):
+        self.backend = backend
+        self.colors_file = WAL_CACHE_DIR / "colors.json"
+        self.palette = None
+        self.colors_state = None
+        self.running = True
+        self.renders = 0
+
+    def serve(self):
+        import socket
+
+        if daemon_request("status") is not None:
+            print(f"A daemon is already listening on {DAEMON_SOCKET}")
+            return False
+
+        DAEMON_SOCKET.parent.mkdir(parents=True, exist_ok=True)
+        DAEMON_SOCKET.unlink(missing_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(DAEMON_SOCKET))
+        server.listen()
+
+        watcher = make_watcher(self.colors_file)
+        selector = selectors.DefaultSelector()
+        selector.register(server, selectors.EVENT_READ, "socket")
+        if watcher.fileno() is not None:
+            selector.register(watcher.fileno(), selectors.EVENT_READ, "watch")
+
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        print(f"Theme daemon watching {self.colors_file} ({type(watcher).__name__})")
+        for target in all_targets():
+            target.tokens  # compile templates up front
+        self.refresh(force=True)
+
+        due = None
+        try:
+            while self.running:
+                timeout = watcher.timeout
+                if due is not None:
+                    timeout = max(0.0, due - time.monotonic())
+
+                for key, _ in selector.select(timeout):
+                    if key.data == "socket":
+                        self.handle(server.accept()[0])
+                    else:
+                        watcher.drain()
+                        due = time.monotonic() + DAEMON_DEBOUNCE
+
+                if due is None and watcher.timeout is not None:
+                    self.refresh()
+                elif due is not None and time.monotonic() >= due:
+                    due = None
+                    self.refresh()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            selector.close()
+            watcher.close()
+            server.close()
+            DAEMON_SOCKET.unlink(missing_ok=True)
+        return True
+
+    def stop(self):
+        self.running = False
+
+    def refresh(self, force=False, only=None):
+        """Re-render targets whose tokens changed since they were last applied."""
+        state = file_state(self.colors_file)
+        if state == self.colors_state and not force:
+            return []
+
+        from theme import Palette
+
+        palette = Palette.load(self.colors_file)
+        if palette is None and self.colors_file.exists():
+            # Caught mid-write by a non-atomic writer; the next event retries
+            return []
+        self.colors_state = state
+        self.palette = palette
+        write_theme_artifact(palette, self.colors_file)
+
+        targets = [t for t in all_targets() if not only or t.name in only]
+        with WRITE_STATS_LOCK:
+            WRITE_STATS.update(written=0, skipped=0)
+        start = time.perf_counter()
+        results, unchanged = apply_targets(targets, palette, force=force)
+        if not results:
+            print("Palette changed, no target affected")
+            return []
+
+        print_timings(results, time.perf_counter() - start, unchanged)
+        self.renders += 1
+        return list(results)
+
+    def read_request(self, connection):
+        """The command line a client sent, up to end of input or the timeout.
+
+        A client that stays silent gets an empty command instead of holding up
+        the file watch.
+        """
+        connection.settimeout(DAEMON_REQUEST_TIMEOUT)
+        data = b""
+        try:
+            while chunk := connection.recv(4096):
+                data += chunk
+        except OSError:
+            pass
+        lines = data.decode(errors="replace").splitlines()
+        return lines[0] if lines else ""
+
+    def handle(self, connection):
+        with connection:
+            # The rest of the line is kept as sent: a wallpaper path may contain
+            # runs of spaces
+            command, _, rest = self.read_request(connection).lstrip().partition(" ")
+            args = rest.split()
+
+            if command == "reload":
+                affected = self.refresh(force=True, only=set(args) or None)
+                reply = f"reloaded: {', '.join(affected) or 'nothing'}"
+            elif command == "wallpaper" and rest.strip():
+                if set_wallpaper(rest, backend=self.backend):
+                    affected = self.refresh()
+                    reply = f"reloaded: {', '.join(affected) or 'nothing'}"
+                else:
+                    reply = "error: could not set wallpaper"
+            elif command == "status":
+                reply = json.dumps(
+                    {
+                        "pid": os.getpid(),
+                        "palette": self.palette is not None,
+                        "renders": self.renders,
+                    }
+                )
+            elif command == "stop":
+                self.stop()
+                reply = "stopping"
+            else:
+                reply = (
+                    "error: expected reload [target ...], wallpaper PATH, status"
+                    " or stop"
+                )
+
+            try:
+                connection.sendall(reply.encode() + b"\n")
+            except OSError:
+                pass
+
+
+def daemon_request(command):
+    """Send one command to a running daemon; None if nothing is listening."""
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(DAEMON_SOCKET))
+            client.sendall(command.encode())
+            client.shutdown(socket.SHUT_WR)
+            return b"".join(iter(lambda: client.recv(4096), b"")).decode().strip()
+    except OSError:
+        return None
+
+
+def add_backend_argument(parser):
+    parser.add_argument(
+        "--backend",
+        choices=["native", "wal"],
+        default="native",
+        help="palette extractor: built-in (falls back to pywal for images it"
+        " can't decode) or pywal (default: native)",
+    )
+
+
+def positive(convert):
+    """argparse type: convert(value), rejected unless it's greater than zero."""
+
+    def parse(value):
+        import argparse
+
+        try:
+            number = convert(value)
+        except ValueError:
+            number = None
+        if number is None or not 0 < number < float("inf"):
+            raise argparse.ArgumentTypeError(
+                f"expected a finite number above 0: {value!r}"
+            )
+        return number
+
+    return parse
+
+
+def add_transition_arguments(parser):
+    parser.add_argument(
+        "--transition",
+        type=positive(int),
+        default=0,
+        metavar="FRAMES",
+        help="fade SketchyBar and borders to the new colors over FRAMES frames",
+    )
+    parser.add_argument(
+        "--fps",
+        type=positive(float),
+        default=30.0,
+        help="frame rate of --transition (default: 30)",
+    )
+
+
+def parse_args():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Regenerate pywal colors and re-theme editors, borders and bar."
+    )
+    parser.add_argument("wallpaper", nargs="?", help="image to generate colors from")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always extract colors instead of reusing a cached palette",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="stay running and re-theme whenever ~/.cache/wal/colors.json changes",
+    )
+    parser.add_argument(
+        "--send",
+        metavar="COMMAND",
+        help="send a command (reload [target ...], wallpaper PATH, status, stop)"
+        " to a running daemon",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="record a Chrome/Perfetto trace of every stage, subprocess and file"
+        " access",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-run every target even if its inputs are unchanged",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="report interpreter, import and tool discovery time",
+    )
+    add_backend_argument(parser)
+    add_transition_arguments(parser)
+    return parser.parse_args()
+
+
+def profile_startup(argv):
+    """Rerun this command under -X importtime and summarize where startup went."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", REPO_DIR / "reload-theme.py", *argv],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall_time = time.perf_counter() - start
+
+    total = 0.0
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            print(line, file=sys.stderr)
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # Nested imports are indented two spaces per level under their importer
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        ms = int(cumulative) / 1000
+        if depth == 0:
+            total += ms
+        if depth <= 1:
+            imports.append((ms, name.strip()))
+
+    print("\nStartup profile:")
+    print(f"  process      {wall_time * 1000:8.1f} ms  (interpreter + imports + run)")
+    print(f"  imports      {total:8.1f} ms, slowest:")
+    for ms, name in sorted(imports, reverse=True)[:10]:
+        print(f"    {name:<24} {ms:6.1f} ms")
+    return result.returncode
+
+
+def main():
+    if sys.argv[1:2] == ["precompute"]:
+        sys.exit(precompute_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["rotate"]:
+        sys.exit(rotate_main(sys.argv[2:]))
+
+    if "--profile-startup" in sys.argv[1:] and "importtime" not in sys._xoptions:
+        sys.exit(profile_startup(sys.argv[1:]))
+
+    args = parse_args()
+
+    if args.trace:
+        trace.enable()
+    try:
+        with trace.span("reload-theme", argv=sys.argv[1:]):
+            reload_theme(args)
+    finally:
+        if args.trace:
+            trace.write(args.trace)
+            print(f"Trace written to {args.trace}")
+        if args.profile_startup:
+            stats = DISCOVERY_STATS
+            print(
+                f"Tool discovery: {stats['seconds'] * 1000:.1f} ms"
+                f" ({stats['cached']} cached, {stats['resolved']} resolved)"
+            )
+
+
+def reload_theme(args):
+    if args.send:
+        reply = daemon_request(args.send)
+        if reply is None:
+            print(f"No daemon listening on {DAEMON_SOCKET}")
+            sys.exit(1)
+        print(reply)
+        return
+
+    if args.daemon:
+        if args.wallpaper and not set_wallpaper(
+            args.wallpaper, use_cache=not args.no_cache, backend=args.backend
+        ):
+            sys.exit(1)
+        sys.exit(0 if ThemeDaemon(args.backend).serve() else 1)
+
+    if args.wallpaper:
+        if not set_wallpaper(
+            args.wallpaper, use_cache=not args.no_cache, backend=args.backend
+        ):
+            sys.exit(1)
+
+    if not (args.wallpaper or args.force) and fastpath.unchanged():
+        print(fastpath.NOTHING_TO_DO)
+        return
+
+    from theme import Palette, artifact
+
+    start = time.perf_counter()
+    palette = Palette.load(WAL_CACHE_DIR / "colors.json")
+    previous = artifact.load()
+    if args.transition and previous is not None and palette is not None:
+        animate_transition(
+            Palette(previous["palette"]), palette, args.transition, args.fps
+        )
+    write_theme_artifact(palette)
+    results, unchanged = apply_targets(all_targets(), palette, force=args.force)
+    print_timings(results, time.perf_counter() - start, unchanged)
+
+    print("")
+    if fully_applied(results):
+        # Taken after the run: the editor targets may have just rewritten their settings
+        record_no_op()
+    if not results or any(ok for ok, _ in results.values()):
+        print("Theme reloaded")
+    else:
+        print("Theme reload completed with errors")
+        sys.exit(1)
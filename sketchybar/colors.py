@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 
-import json
+from __future__ import annotations
+
+import sys
 from pathlib import Path
 
-COLORS_FILE = Path.home() / ".cache" / "wal" / "colors.json"
+# sketchybar/ is symlinked into ~/.config, the theme package lives at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Palette is only named in an annotation (not evaluated), so starting the bar
+# doesn't load the palette and color math modules
+import theme  # noqa: E402
+from theme import artifact  # noqa: E402
 
 DEFAULTS = {
     "BAR_COLOR": "0x00000000",
@@ -17,49 +25,26 @@ DEFAULTS = {
 }
 
 
-def hex_to_argb(hex_color: str) -> str:
-    hex_color = hex_color.lstrip("#")
-    return f"0xff{hex_color}"
-
-
-def lighten_hex(hex_color: str, amount: int = 20) -> str:
-    hex_color = hex_color.lstrip("#")
-    r = int(hex_color[0:2], 16)
-    g = int(hex_color[2:4], 16)
-    b = int(hex_color[4:6], 16)
-
-    r = min(255, r + amount)
-    g = min(255, g + amount)
-    b = min(255, b + amount)
-
-    return f"0xff{r:02x}{g:02x}{b:02x}"
-
-
 def get_colors() -> dict[str, str]:
-    if not COLORS_FILE.exists():
-        return DEFAULTS.copy()
-
-    try:
-        with open(COLORS_FILE) as f:
-            wal = json.load(f)
-
-        bg = wal["special"]["background"]
-        color1 = wal["colors"]["color1"]
-        color4 = wal["colors"]["color4"]
-        color6 = wal["colors"]["color6"]
-
-        return {
-            "BAR_COLOR": hex_to_argb(bg),
-            "ITEM_BG_COLOR": hex_to_argb(bg),
-            "ACCENT_COLOR": hex_to_argb(color1),
-            "ICON_COLOR": hex_to_argb(color4),
-            "LABEL_COLOR": hex_to_argb(color6),
-            "POPUP_BACKGROUND_COLOR": hex_to_argb(bg),
-            "POPUP_BORDER_COLOR": hex_to_argb(color1),
-            "SHADOW_COLOR": "0x80000000",
-        }
-    except (json.JSONDecodeError, KeyError):
+    """Values reload-theme precomputed into the theme artifact."""
+    compiled = artifact.load()
+    if compiled is None or "sketchybar" not in compiled["consumers"]:
         return DEFAULTS.copy()
+    return {**DEFAULTS, **compiled["consumers"]["sketchybar"]}
+
+
+def colors_for(palette: theme.Palette) -> dict[str, str]:
+    """The mapping reload-theme compiles into the artifact."""
+    return {
+        "BAR_COLOR": palette.argb("bg"),
+        "ITEM_BG_COLOR": palette.argb("bg"),
+        "ACCENT_COLOR": palette.argb("accent"),
+        "ICON_COLOR": palette.argb("icon"),
+        "LABEL_COLOR": palette.argb("label"),
+        "POPUP_BACKGROUND_COLOR": palette.argb("bg"),
+        "POPUP_BORDER_COLOR": palette.argb("accent"),
+        "SHADOW_COLOR": "0x80000000",
+    }
 
 
 if __name__ == "__main__":
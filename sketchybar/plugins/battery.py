@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 
-import os
+import itertools
 import re
 import subprocess
+import time
+
+import client
+import probes
 
 ICON_FULL = "󰁹"
 ICON_HIGH = "󰂀"
@@ -11,16 +15,16 @@ ICON_LOW = "󰁻"
 ICON_CRITICAL = "󰁺"
 ICON_CHARGING = "󰂄"
 
+# How often watch() polls pmset -g batt if the pslog stream isn't available
+POLL_INTERVAL = 120
+
+PERCENTAGE = re.compile(r"(\d+)%")
 
-def get_battery_info() -> tuple[int, bool]:
-    result = subprocess.run(
-        ["pmset", "-g", "batt"],
-        capture_output=True,
-        text=True,
-    )
-    output = result.stdout
 
-    match = re.search(r"(\d+)%", output)
+def get_battery_info(ttl: float = probes.DEFAULT_TTL) -> tuple[int, bool]:
+    output = probes.run("pmset_batt", ["pmset", "-g", "batt"], ttl)
+
+    match = PERCENTAGE.search(output)
     percentage = int(match.group(1)) if match else 0
 
     charging = "AC Power" in output
@@ -42,14 +46,78 @@ def get_icon(percentage: int, charging: bool) -> str:
     return ICON_CRITICAL
 
 
-def main():
-    name = os.environ.get("NAME", "battery")
-    percentage, charging = get_battery_info()
-    icon = get_icon(percentage, charging)
-    subprocess.run(
-        ["sketchybar", "--set", name, f"icon={icon}", f"label={percentage}%"]
-    )
+def item_properties(percentage: int, charging: bool) -> dict[str, str]:
+    return {"icon": get_icon(percentage, charging), "label": f"{percentage}%"}
+
+
+def properties(event) -> dict[str, str]:
+    # The cached reading predates a power source change
+    fresh = event.get("SENDER") == "power_source_change"
+    return item_properties(*get_battery_info(0 if fresh else probes.DEFAULT_TTL))
+
+
+def parse_pslog(lines):
+    """Yield (percentage, charging) from `pmset -g pslog` output as it changes.
+
+    lines is any iterable of text lines, e.g. the pipe from a running pmset.
+    Like get_battery_info(), charging means drawing from AC power. A state is
+    only yielded when it differs from the previous one.
+    """
+    charging, last = False, None
+    for line in lines:
+        if "drawing from" in line:
+            charging = "AC Power" in line
+            continue
+        match = PERCENTAGE.search(line)
+        if match is None:
+            continue
+        state = int(match.group(1)), charging
+        if state != last:
+            last = state
+            yield state
+
+
+def pslog_states():
+    """Battery states from one long-running pmset; ends if pmset can't run or exits."""
+    try:
+        process = subprocess.Popen(
+            ["pmset", "-g", "pslog"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except OSError:
+        return
+    try:
+        yield from parse_pslog(process.stdout)
+    finally:
+        process.kill()
+        process.wait()
+
+
+def polled_states(interval=POLL_INTERVAL):
+    while True:
+        try:
+            yield get_battery_info(0)
+        except OSError:
+            return
+        time.sleep(interval)
+
+
+def watch(on_change, states=None):
+    """Call on_change(item properties) when the percentage or charging state changes.
+
+    Follows the pslog stream, falling back to polling if it stops; states
+    replaces both with any iterable of (percentage, charging).
+    """
+    if states is None:
+        states = itertools.chain(pslog_states(), polled_states())
+    last = None
+    for state in states:
+        if state != last:
+            last = state
+            on_change(item_properties(*state))
 
 
 if __name__ == "__main__":
-    main()
+    client.run_plugin(properties, "battery")
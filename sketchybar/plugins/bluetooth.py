@@ -1,53 +1,50 @@
 #!/usr/bin/env python3
 
-import os
 import shutil
-import subprocess
+
+import client
+import probes
 
 ICON_CONNECTED = "󰂱"
 ICON_ON = "󰂯"
 ICON_OFF = "󰂲"
 
 
-def get_bluetooth_power() -> bool:
-    result = subprocess.run(
-        ["blueutil", "-p"],
-        capture_output=True,
-        text=True,
-    )
-    return result.stdout.strip() == "1"
+def get_bluetooth_power(ttl: float = probes.DEFAULT_TTL) -> bool:
+    return probes.run("blueutil_power", ["blueutil", "-p"], ttl).strip() == "1"
 
 
-def get_connected_count() -> int:
-    result = subprocess.run(
-        ["blueutil", "--connected"],
-        capture_output=True,
-        text=True,
-    )
-    if not result.stdout.strip():
+def get_connected_count(ttl: float = probes.DEFAULT_TTL) -> int:
+    output = probes.run("blueutil_connected", ["blueutil", "--connected"], ttl)
+    if not output.strip():
         return 0
-    return result.stdout.count("address")
+    return output.count("address")
 
 
-def main():
-    name = os.environ.get("NAME", "bluetooth")
+def state(ttl: float = probes.DEFAULT_TTL) -> tuple[bool, int] | None:
+    """(power, connected devices), or None without blueutil.
 
+    A change here is what the watcher reports as bluetooth_change.
+    """
     if not shutil.which("blueutil"):
-        subprocess.run(["sketchybar", "--set", name, f"icon={ICON_OFF}", "label=N/A"])
-        return
+        return None
+    if not get_bluetooth_power(ttl):
+        return False, 0
+    return True, get_connected_count(ttl)
+
 
-    if not get_bluetooth_power():
-        subprocess.run(["sketchybar", "--set", name, f"icon={ICON_OFF}", "label="])
-        return
+def properties(event) -> dict[str, str]:
+    current = state()
+    if current is None:
+        return {"icon": ICON_OFF, "label": "N/A"}
 
-    count = get_connected_count()
+    power, count = current
+    if not power:
+        return {"icon": ICON_OFF, "label": ""}
     if count > 0:
-        subprocess.run(
-            ["sketchybar", "--set", name, f"icon={ICON_CONNECTED}", f"label={count}"]
-        )
-    else:
-        subprocess.run(["sketchybar", "--set", name, f"icon={ICON_ON}", "label="])
+        return {"icon": ICON_CONNECTED, "label": str(count)}
+    return {"icon": ICON_ON, "label": ""}
 
 
 if __name__ == "__main__":
-    main()
+    client.run_plugin(properties, "bluetooth")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""SketchyBar client shared by the plugins, with write deduplication.
+
+The properties last sent to each item are remembered in
+~/.cache/sketchybar/items.json, so an update that matches what the bar already
+shows (the clock within the same minute, battery at the same percentage) costs
+no sketchybar process. The file is shared by the plugin host and any plugin
+run on its own, and also counts sent and suppressed item updates; run this
+file to print them.
+
+Batch collects updates from any number of providers for a short window and
+sends them merged per item as one call. From a shell,
+`client.py --set ITEM key=value ... [--set ITEM ...]` hands the updates to
+the plugin host's current batch when it's running.
+"""
+
+import fcntl
+import json
+import os
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+RUN_DIR = Path.home() / ".cache" / "sketchybar"
+STATE_FILE = RUN_DIR / "items.json"
+PID_FILE = RUN_DIR / "host.pid"
+EVENT_FIFO = RUN_DIR / "events"
+# Held by event.sh while it starts a replacement host
+START_LOCK = RUN_DIR / "host.starting"
+
+# How long a Batch waits for more updates before sending
+WINDOW = 0.02
+
+
+def empty_state():
+    return {"items": {}, "sent": 0, "suppressed": 0}
+
+
+@contextmanager
+def locked_state():
+    """The state dict, locked against other processes and saved on exit."""
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATE_FILE, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        try:
+            state = json.loads(f.read())
+        except ValueError:
+            state = None
+        if not isinstance(state, dict) or not isinstance(state.get("items"), dict):
+            state = empty_state()
+        yield state
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps(state))
+
+
+def set_items(updates, force=()):
+    """Send {item: {property: value}} as one sketchybar call, minus unchanged values.
+
+    Items named in force are sent in full. Returns the number of items sent.
+    """
+    with locked_state() as state:
+        args, changes = [], {}
+        for item, properties in updates.items():
+            last = state["items"].get(item, {})
+            changed = {
+                key: str(value)
+                for key, value in properties.items()
+                if item in force or last.get(key) != str(value)
+            }
+            if not changed:
+                state["suppressed"] += 1
+                continue
+            changes[item] = changed
+            pairs = [f"{key}={value}" for key, value in changed.items()]
+            args += ["--set", item, *pairs]
+
+        if not args or subprocess.run(["sketchybar", *args]).returncode != 0:
+            return 0
+        for item, changed in changes.items():
+            state["items"].setdefault(item, {}).update(changed)
+        state["sent"] += len(changes)
+        return len(changes)
+
+
+def set_item(name, properties, force=False):
+    return set_items({name: properties}, force=(name,) if force else ())
+
+
+class Batch:
+    """Item updates from any thread, sent together as one sketchybar call.
+
+    Updates to the same item merge, later values winning. The batch is
+    flushed window seconds after the first update since the last flush, or
+    only by calling flush() when window is None.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.updates = {}
+        self.forced = set()
+        self.timer = None
+
+    def set(self, item, properties, force=False):
+        with self.lock:
+            self.updates.setdefault(item, {}).update(properties)
+            if force:
+                self.forced.add(item)
+            if self.timer is None and self.window is not None:
+                self.timer = threading.Timer(self.window, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Send everything pending; returns the number of items sent."""
+        with self.lock:
+            updates, forced = self.updates, self.forced
+            self.updates, self.forced = {}, set()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        return set_items(updates, force=forced) if updates else 0
+
+
+def host_running():
+    try:
+        os.kill(int(PID_FILE.read_text()), 0)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def set_line(item, properties):
+    """Event FIFO line asking the host to batch an update."""
+    fields = [item, *(f"{key}={value}" for key, value in properties.items())]
+    # Tabs and newlines would break the framing
+    fields = [field.replace("\t", " ").replace("\n", " ") for field in fields]
+    return "\t".join(["set", *fields]) + "\n"
+
+
+def send_to_host(updates):
+    """Queue updates in the plugin host's batch; False if no host is listening."""
+    if not host_running():
+        return False
+    try:
+        fd = os.open(EVENT_FIFO, os.O_WRONLY | os.O_NONBLOCK)
+    except OSError:
+        return False
+    try:
+        lines = "".join(
+            set_line(item, properties) for item, properties in updates.items()
+        )
+        os.write(fd, lines.encode())
+    finally:
+        os.close(fd)
+    return True
+
+
+def parse_set_args(argv):
+    """--set ITEM key=value ... [--set ITEM ...] -> {item: {key: value}}."""
+    updates, item = {}, None
+    for arg in argv:
+        if arg == "--set":
+            item = None
+        elif item is None:
+            item = arg
+            updates.setdefault(item, {})
+        else:
+            key, sep, value = arg.partition("=")
+            if not sep:
+                raise ValueError(f"expected key=value, got {arg!r}")
+            updates[item][key] = value
+    return updates
+
+
+def run_plugin(properties, default_name):
+    """Update one item as a plugin run by SketchyBar on its own.
+
+    properties(event) maps a SketchyBar event, here the script's environment
+    (NAME, SENDER, SELECTED, INFO), to the item's properties; the plugin host
+    calls it the same way.
+    """
+    name = os.environ.get("NAME", default_name)
+    forced = os.environ.get("SENDER") == "forced"
+    set_item(name, properties(os.environ), force=forced)
+
+
+def reset():
+    """Forget what the bar shows, e.g. after SketchyBar reloaded its config."""
+    with locked_state() as state:
+        state["items"] = {}
+
+
+def stats():
+    """Item updates sent and suppressed so far."""
+    with locked_state() as state:
+        return {"sent": state["sent"], "suppressed": state["suppressed"]}
+
+
+def main():
+    if sys.argv[1:]:
+        try:
+            updates = parse_set_args(sys.argv[1:])
+        except ValueError as e:
+            sys.exit(f"client: {e}")
+        if not send_to_host(updates):
+            set_items(updates)
+        return
+
+    counts = stats()
+    total = counts["sent"] + counts["suppressed"]
+    share = counts["suppressed"] / total * 100 if total else 0
+    print(f"sent {counts['sent']}, suppressed {counts['suppressed']} ({share:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
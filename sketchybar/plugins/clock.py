@@ -1,15 +1,13 @@
 #!/usr/bin/env python3
 
-import os
-import subprocess
 from datetime import datetime
 
+import client
 
-def main():
-    name = os.environ.get("NAME", "clock")
-    current_time = datetime.now().strftime("%H:%M")
-    subprocess.run(["sketchybar", "--set", name, f"label={current_time}"])
+
+def properties(event) -> dict[str, str]:
+    return {"label": datetime.now().strftime("%H:%M")}
 
 
 if __name__ == "__main__":
-    main()
+    client.run_plugin(properties, "clock")
@@ -0,0 +1,28 @@
+#!/bin/bash
+
+# Item script: forward a SketchyBar event to the plugin host (host.py), or run
+# the plugin directly and restart the host when it isn't up.
+# Usage: event.sh <plugin>
+
+RUN_DIR="${HOME}/.cache/sketchybar"
+PID_FILE="$RUN_DIR/host.pid"
+EVENT_FIFO="$RUN_DIR/events"
+
+if [ -p "$EVENT_FIFO" ] && kill -0 "$(cat "$PID_FILE" 2>/dev/null)" 2>/dev/null; then
+    # One line per event; tabs and newlines in INFO would break the framing
+    printf '%s\t%s\t%s\t%s\t%s\n' "$1" "$NAME" "$SENDER" "$SELECTED" \
+        "${INFO//[$'\t\n']/ }" > "$EVENT_FIFO"
+else
+    # The host is down, e.g. it crashed: start a new one for the next events
+    # and answer this one directly. The lock keeps a burst of events from
+    # starting several; host.py removes it, and one left by a host that died
+    # while starting expires after a minute.
+    START_LOCK="$RUN_DIR/host.starting"
+    if [ -n "$(find "$START_LOCK" -maxdepth 0 -mmin +1 2>/dev/null)" ]; then
+        rmdir "$START_LOCK"
+    fi
+    if mkdir -p "$RUN_DIR" && mkdir "$START_LOCK" 2>/dev/null; then
+        nohup "$(dirname "$0")/host.py" >/dev/null 2>&1 &
+    fi
+    exec "$(dirname "$0")/$1.py"
+fi
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""One long-lived process for every SketchyBar plugin.
+
+The providers (clock, wifi, bluetooth, battery, volume, space) run in this
+interpreter on an internal schedule instead of SketchyBar forking a fresh
+Python for each update_freq tick; the wifi/bluetooth watchers run in threads
+next to them. Events reach the host through a FIFO that event.sh writes, and
+updates from every provider, plus `client.py --set` requests from shell
+scripts, are merged in one client.Batch that goes out as a single sketchybar
+call, minus what the bar already shows.
+
+sketchybarrc starts it; a new host replaces the one in host.pid.
+"""
+
+import heapq
+import os
+import select
+import signal
+import sys
+import threading
+import time
+import traceback
+
+import battery
+import bluetooth
+import client
+import clock
+import space
+import volume
+import watchers
+import wifi
+
+RUN_DIR = client.RUN_DIR
+PID_FILE = client.PID_FILE
+EVENT_FIFO = client.EVENT_FIFO
+
+# provider -> (module, items it refreshes on its own, interval in seconds).
+# Intervals are aligned to the wall clock, so providers that are due together
+# share one wakeup and one sketchybar call. None means events only.
+PROVIDERS = {
+    "clock": (clock, ["clock"], 60),
+    # Refreshed on wifi_change/bluetooth_change from watchers.py
+    "wifi": (wifi, ["wifi"], None),
+    "bluetooth": (bluetooth, ["bluetooth"], None),
+    # Pushed from battery.watch() as the pmset stream reports changes
+    "battery": (battery, ["battery"], None),
+    "volume": (volume, ["volume"], None),
+    "space": (space, [], None),
+}
+
+
+def next_due(now, every):
+    return now - now % every + every
+
+
+def run_provider(provider, event, batch):
+    module = PROVIDERS[provider][0]
+    try:
+        properties = module.properties(event)
+    except Exception:
+        print(f"host: {provider} failed", file=sys.stderr)
+        traceback.print_exc()
+        return
+    # SketchyBar sends "forced" after loading its config; resend everything
+    batch.set(event["NAME"], properties, force=event["SENDER"] == "forced")
+
+
+def parse_event(line):
+    """event.sh line -> (provider, event mapping like a plugin's environment)."""
+    provider, name, sender, selected, info = (line.split("\t", 4) + [""] * 5)[:5]
+    return provider, {
+        "NAME": name,
+        "SENDER": sender,
+        "SELECTED": selected,
+        "INFO": info,
+    }
+
+
+def handle_line(line, batch):
+    if line.startswith("set\t"):
+        # From client.py --set: set<TAB>item<TAB>key=value...
+        _, item, *pairs = line.split("\t")
+        batch.set(item, dict(pair.partition("=")[::2] for pair in pairs))
+        return
+    provider, event = parse_event(line)
+    if provider in PROVIDERS and event["NAME"]:
+        run_provider(provider, event, batch)
+
+
+def read_available(fd):
+    chunks = []
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except BlockingIOError:
+            break
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def open_fifo():
+    """Reading end of the event FIFO, non-blocking.
+
+    The host also holds a writing end so the FIFO never reports end-of-file
+    between event.sh writers.
+    """
+    RUN_DIR.mkdir(parents=True, exist_ok=True)
+    if not EVENT_FIFO.is_fifo():
+        EVENT_FIFO.unlink(missing_ok=True)
+        os.mkfifo(EVENT_FIFO, 0o600)
+    fd = os.open(EVENT_FIFO, os.O_RDONLY | os.O_NONBLOCK)
+    os.open(EVENT_FIFO, os.O_WRONLY | os.O_NONBLOCK)
+    return fd
+
+
+def replace_running_host():
+    """Stop the host recorded in the pidfile, if any, and take its place."""
+    try:
+        pid = int(PID_FILE.read_text())
+        os.kill(pid, signal.SIGTERM)
+    except (OSError, ValueError):
+        pass
+    else:
+        for _ in range(50):
+            try:
+                os.kill(pid, 0)
+            except OSError:
+                break
+            time.sleep(0.02)
+    RUN_DIR.mkdir(parents=True, exist_ok=True)
+    PID_FILE.write_text(f"{os.getpid()}\n")
+    try:
+        client.START_LOCK.rmdir()
+    except OSError:
+        pass
+
+
+def start_battery_stream(batch):
+    def push(properties):
+        batch.set("battery", properties)
+
+    threading.Thread(
+        target=battery.watch, args=(push,), daemon=True, name="battery"
+    ).start()
+
+
+def serve():
+    fd = open_fifo()
+
+    # Everything with items runs once right away, so the bar is filled in
+    # even if sketchybarrc's --update fired before the host was listening
+    now = time.time()
+    queue = [(now, provider) for provider, (_, items, _) in PROVIDERS.items() if items]
+    heapq.heapify(queue)
+
+    # Events arriving within the batch window (e.g. space_change for every
+    # space) are answered with a single sketchybar call
+    batch = client.Batch()
+    start_battery_stream(batch)
+    pending = b""
+    while True:
+        timeout = max(0.0, queue[0][0] - time.time()) if queue else None
+        ready, _, _ = select.select([fd], [], [], timeout)
+
+        if ready:
+            *lines, pending = (pending + read_available(fd)).split(b"\n")
+            for line in lines:
+                handle_line(line.decode(errors="replace"), batch)
+
+        now = time.time()
+        while queue and queue[0][0] <= now:
+            _, provider = heapq.heappop(queue)
+            _, items, every = PROVIDERS[provider]
+            for item in items:
+                run_provider(provider, {"NAME": item, "SENDER": "routine"}, batch)
+            if every:
+                heapq.heappush(queue, (next_due(now, every), provider))
+
+
+def main():
+    replace_running_host()
+    # Started by sketchybarrc, so the bar has just been (re)configured
+    client.reset()
+    watchers.start()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            if int(PID_FILE.read_text()) == os.getpid():
+                PID_FILE.unlink()
+        except (OSError, ValueError):
+            pass
+
+
+if __name__ == "__main__":
+    main()
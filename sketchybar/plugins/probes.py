@@ -0,0 +1,59 @@
+"""System probes shared by the plugins, cached with a TTL.
+
+A probe is a named command whose output a plugin parses (pmset, networksetup,
+ipconfig, blueutil, osascript). Its last output is kept in
+~/.cache/sketchybar/probes/<name>.json, so for as long as it's younger than the
+caller's TTL every plugin, thread and process reuses it instead of running the
+command again. A per-probe lock makes concurrent callers wait for the one run
+in flight and take its result.
+"""
+
+import fcntl
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+PROBE_DIR = Path.home() / ".cache" / "sketchybar" / "probes"
+
+# Results younger than this are what the plugins share unless they ask otherwise
+DEFAULT_TTL = 5
+
+
+def cached(name, ttl):
+    """Output of the last run of name if it's younger than ttl seconds."""
+    try:
+        with open(PROBE_DIR / f"{name}.json") as f:
+            entry = json.load(f)
+        if time.time() - entry["time"] < ttl:
+            return entry["stdout"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def run(name, argv, ttl):
+    """stdout of argv, reusing a result of name from the last ttl seconds.
+
+    ttl=0 always runs the command, and the fresh result is shared with
+    everyone else asking for name.
+    """
+    if ttl > 0 and (output := cached(name, ttl)) is not None:
+        return output
+
+    PROBE_DIR.mkdir(parents=True, exist_ok=True)
+    started = time.time()
+    with open(PROBE_DIR / f"{name}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        # Someone else may have run it while we waited for the lock
+        output = cached(name, time.time() - started if ttl <= 0 else ttl)
+        if output is not None:
+            return output
+
+        output = subprocess.run(argv, capture_output=True, text=True).stdout
+        path = PROBE_DIR / f"{name}.json"
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        tmp.write_text(json.dumps({"time": time.time(), "stdout": output}))
+        os.replace(tmp, path)
+        return output
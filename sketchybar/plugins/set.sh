@@ -0,0 +1,27 @@
+#!/bin/bash
+
+# `sketchybar --set` for shell scripts that fire often (the yabai signals):
+# hands the updates to the plugin host's batch through its FIFO, the way
+# event.sh forwards events, or runs sketchybar itself when the host isn't up.
+# Usage: set.sh --set ITEM key=value ... [--set ITEM ...]
+
+RUN_DIR="${HOME}/.cache/sketchybar"
+PID_FILE="$RUN_DIR/host.pid"
+EVENT_FIFO="$RUN_DIR/events"
+
+if [ -p "$EVENT_FIFO" ] && kill -0 "$(cat "$PID_FILE" 2>/dev/null)" 2>/dev/null; then
+    # One set<TAB>item<TAB>key=value... line per item, as client.py writes them
+    lines="" line=""
+    for arg in "$@"; do
+        if [ "$arg" = "--set" ]; then
+            [ -n "$line" ] && lines+="$line"$'\n'
+            line="set"
+        else
+            line+=$'\t'"${arg//[$'\t\n']/ }"
+        fi
+    done
+    [ -n "$line" ] && lines+="$line"$'\n'
+    printf '%s' "$lines" > "$EVENT_FIFO"
+else
+    exec sketchybar "$@"
+fi
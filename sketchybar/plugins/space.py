@@ -1,14 +1,12 @@
 #!/usr/bin/env python3
 
-import os
-import subprocess
 
+import client
 
-def main():
-    name = os.environ.get("NAME", "space")
-    selected = os.environ.get("SELECTED", "off")
-    subprocess.run(["sketchybar", "--set", name, f"background.drawing={selected}"])
+
+def properties(event) -> dict[str, str]:
+    return {"background.drawing": event.get("SELECTED") or "off"}
 
 
 if __name__ == "__main__":
-    main()
+    client.run_plugin(properties, "space")
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 
-import os
-import subprocess
+
+import client
+import probes
 
 ICON_HIGH = "󰕾"
 ICON_MEDIUM = "󰖀"
@@ -11,13 +12,9 @@ ICON_MUTE = "󰖁"
 
 def get_current_volume() -> int:
     """Get current system volume using osascript."""
-    result = subprocess.run(
-        ["osascript", "-e", "output volume of (get volume settings)"],
-        capture_output=True,
-        text=True,
-    )
+    argv = ["osascript", "-e", "output volume of (get volume settings)"]
     try:
-        return int(result.stdout.strip())
+        return int(probes.run("volume", argv, probes.DEFAULT_TTL).strip())
     except ValueError:
         return 0
 
@@ -32,27 +29,18 @@ def get_icon(volume: int) -> str:
     return ICON_MUTE
 
 
-def update_volume(name: str, volume: int) -> None:
-    icon = get_icon(volume)
-    subprocess.run(["sketchybar", "--set", name, f"icon={icon}", f"label={volume}%"])
-
-
-def main():
-    name = os.environ.get("NAME", "volume")
-    sender = os.environ.get("SENDER", "")
-
-    if sender == "volume_change":
-        volume_str = os.environ.get("INFO", "0")
+def properties(event) -> dict[str, str]:
+    if event.get("SENDER") == "volume_change":
         try:
-            volume = int(volume_str)
+            volume = int(event.get("INFO", "0"))
         except ValueError:
             volume = 0
     else:
         # Initial load - get current volume from system
         volume = get_current_volume()
 
-    update_volume(name, volume)
+    return {"icon": get_icon(volume), "label": f"{volume}%"}
 
 
 if __name__ == "__main__":
-    main()
+    client.run_plugin(properties, "volume")
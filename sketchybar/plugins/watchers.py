@@ -0,0 +1,94 @@
+"""Wifi and bluetooth state watchers that trigger SketchyBar events on changes.
+
+Wifi waits on SystemConfiguration notifications through `scutil`, so nothing
+runs until the interface changes. Bluetooth has no notification source that
+blueutil exposes, so it's polled, and the result is diffed against the
+previous poll. Either way `sketchybar --trigger <event>` only fires when the
+state really differs, and the subscribed items need no update_freq.
+"""
+
+import itertools
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import bluetooth
+import wifi
+
+POLL_INTERVAL = 5
+
+WIFI_KEYS = [
+    f"State:/Network/Interface/{wifi.WIFI_INTERFACE}/AirPort",
+    f"State:/Network/Interface/{wifi.WIFI_INTERFACE}/Link",
+    f"State:/Network/Interface/{wifi.WIFI_INTERFACE}/IPv4",
+]
+
+
+def poll(interval=POLL_INTERVAL):
+    while True:
+        time.sleep(interval)
+        yield
+
+
+def scutil_notifications(keys):
+    """Yield once per change to any of the SystemConfiguration keys.
+
+    Ends when scutil isn't installed or exits.
+    """
+    if not shutil.which("scutil"):
+        return
+    process = subprocess.Popen(
+        ["scutil"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    # scutil quits at end of input, so stdin stays open for as long as we watch
+    process.stdin.write("".join(f"n.add {key}\n" for key in keys) + "n.watch\n")
+    process.stdin.flush()
+    for line in process.stdout:
+        if line.startswith("notification callback"):
+            yield
+    process.wait()
+
+
+def watch(event, probe, changes):
+    """Trigger event whenever probe() returns something new after a change."""
+
+    def current():
+        try:
+            # Always a fresh reading; the item update it triggers reuses it
+            return probe(ttl=0)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"watchers: {event} probe failed: {e}", file=sys.stderr)
+            return None
+
+    last = current()
+    for _ in changes:
+        state = current()
+        if state != last:
+            last = state
+            subprocess.run(["sketchybar", "--trigger", event])
+
+
+WATCHERS = {
+    # Falls back to polling if scutil is missing or stops
+    "wifi_change": (
+        wifi.state,
+        lambda: itertools.chain(scutil_notifications(WIFI_KEYS), poll()),
+    ),
+    "bluetooth_change": (bluetooth.state, poll),
+}
+
+
+def start():
+    """Run every watcher in a daemon thread."""
+    for event, (probe, changes) in WATCHERS.items():
+        thread = threading.Thread(
+            target=watch, args=(event, probe, changes()), daemon=True
+        )
+        thread.name = event
+        thread.start()
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 
-import os
-import subprocess
+
+import client
+import probes
 
 WIFI_INTERFACE = "en0"
 
@@ -10,22 +11,14 @@ ICON_DISCONNECTED = "󰤯"
 ICON_CONNECTED = "󰤨"
 
 
-def get_wifi_power() -> bool:
-    result = subprocess.run(
-        ["networksetup", "-getairportpower", WIFI_INTERFACE],
-        capture_output=True,
-        text=True,
-    )
-    return "On" in result.stdout
+def get_wifi_power(ttl: float = probes.DEFAULT_TTL) -> bool:
+    argv = ["networksetup", "-getairportpower", WIFI_INTERFACE]
+    return "On" in probes.run("wifi_power", argv, ttl)
 
 
-def get_ssid() -> str | None:
-    result = subprocess.run(
-        ["ipconfig", "getsummary", WIFI_INTERFACE],
-        capture_output=True,
-        text=True,
-    )
-    for line in result.stdout.splitlines():
+def get_ssid(ttl: float = probes.DEFAULT_TTL) -> str | None:
+    output = probes.run("wifi_summary", ["ipconfig", "getsummary", WIFI_INTERFACE], ttl)
+    for line in output.splitlines():
         if "SSID" in line and "BSSID" not in line:
             parts = line.split(" : ")
             if len(parts) >= 2:
@@ -33,18 +26,23 @@ def get_ssid() -> str | None:
     return None
 
 
-def main():
-    name = os.environ.get("NAME", "wifi")
+def state(ttl: float = probes.DEFAULT_TTL) -> tuple[bool, str | None]:
+    """(power, SSID or None); a change here is a wifi_change."""
+    power = get_wifi_power(ttl)
+    return power, get_ssid(ttl) if power else None
+
 
-    if not get_wifi_power():
+def properties(event) -> dict[str, str]:
+    power, ssid = state()
+    if not power:
         icon = ICON_OFF
-    elif get_ssid() is None:
+    elif ssid is None:
         icon = ICON_DISCONNECTED
     else:
         icon = ICON_CONNECTED
 
-    subprocess.run(["sketchybar", "--set", name, f"icon={icon}", "label="])
+    return {"icon": icon, "label": ""}
 
 
 if __name__ == "__main__":
-    main()
+    client.run_plugin(properties, "wifi")
@@ -0,0 +1,91 @@
+"""battery.parse_pslog and battery.watch against fake pmset -g pslog streams."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(
+    0, str(Path(__file__).resolve().parent.parent / "sketchybar" / "plugins")
+)
+
+import battery  # noqa: E402
+
+ON_BATTERY = "Now drawing from 'Battery Power'\n"
+ON_AC = "Now drawing from 'AC Power'\n"
+
+
+def reading(percentage, status="discharging; 3:10 remaining"):
+    return f" -InternalBattery-0 (id=4653155)\t{percentage}%; {status} present: true\n"
+
+
+def fake_stream(*lines):
+    """Lines as a running pmset would hand them over, one at a time."""
+    yield from lines
+
+
+class ParsePslogTest(unittest.TestCase):
+    def parse(self, *lines):
+        return list(battery.parse_pslog(fake_stream(*lines)))
+
+    def test_percentage_change(self):
+        states = self.parse(ON_BATTERY, reading(87), reading(86), reading(85))
+        self.assertEqual(states, [(87, False), (86, False), (85, False)])
+
+    def test_switch_between_ac_and_battery(self):
+        states = self.parse(
+            ON_BATTERY,
+            reading(50),
+            ON_AC,
+            reading(50, "charging; 1:20 remaining"),
+            ON_BATTERY,
+            reading(50),
+        )
+        self.assertEqual(states, [(50, False), (50, True), (50, False)])
+
+    def test_duplicate_readings_are_suppressed(self):
+        states = self.parse(
+            ON_AC,
+            reading(99, "charging; 0:05 remaining"),
+            reading(99, "charging; 0:04 remaining"),
+            ON_AC,
+            reading(99, "charging; 0:03 remaining"),
+        )
+        self.assertEqual(states, [(99, True)])
+
+    def test_lines_without_a_percentage_are_ignored(self):
+        states = self.parse("\n", "some other pmset chatter\n", ON_BATTERY, reading(40))
+        self.assertEqual(states, [(40, False)])
+
+
+class WatchTest(unittest.TestCase):
+    def test_pushes_item_properties_only_on_changes(self):
+        pushed = []
+        stream = fake_stream(
+            ON_BATTERY, reading(61), reading(61), reading(60), ON_AC, reading(60)
+        )
+        battery.watch(pushed.append, states=battery.parse_pslog(stream))
+        self.assertEqual(
+            pushed,
+            [
+                {"icon": battery.ICON_HIGH, "label": "61%"},
+                {"icon": battery.ICON_HIGH, "label": "60%"},
+                {"icon": battery.ICON_CHARGING, "label": "60%"},
+            ],
+        )
+
+    def test_repeated_states_from_any_source_are_dropped(self):
+        pushed = []
+        battery.watch(
+            pushed.append, states=iter([(20, False), (20, False), (9, False)])
+        )
+        self.assertEqual(
+            pushed,
+            [
+                {"icon": battery.ICON_LOW, "label": "20%"},
+                {"icon": battery.ICON_CRITICAL, "label": "9%"},
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
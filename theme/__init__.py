@@ -0,0 +1,15 @@
+# Submodules load on first use, so importing one of them (say theme.trace)
+# doesn't pull in the palette and template machinery
+def __getattr__(name):
+    if name == "Palette":
+        from .palette import Palette
+
+        return Palette
+    if name in ("Template", "load_template"):
+        from . import template
+
+        return getattr(template, name)
+    raise AttributeError(f"module 'theme' has no attribute {name!r}")
+
+
+__all__ = ["Palette", "Template", "load_template"]
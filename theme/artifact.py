@@ -0,0 +1,66 @@
+"""The compiled theme: one file per reload that every consumer reads as-is.
+
+reload-theme writes ~/.cache/reload-theme/theme.json with the raw pywal
+palette, every derived token as hex and ARGB, and the per-consumer values
+(SketchyBar's color variables, the borders gradient). theme.sh holds the same
+values as shell exports for bordersrc and plugin scripts.
+"""
+
+import json
+import shlex
+from pathlib import Path
+
+# Bumped whenever the layout changes; readers ignore other versions
+VERSION = 1
+
+ARTIFACT_FILE = Path.home() / ".cache" / "reload-theme" / "theme.json"
+SHELL_FILE = ARTIFACT_FILE.with_suffix(".sh")
+
+
+def build(palette, source_mtime_ns, consumers):
+    """The artifact dict; consumers maps a name to its precomputed {NAME: value}."""
+    return {
+        "version": VERSION,
+        "source_mtime_ns": source_mtime_ns,
+        "palette": palette.wal,
+        "tokens": {
+            name: {"hex": palette.hex[name], "argb": palette.argb(name)}
+            for name in palette.hex
+        },
+        "consumers": {name: dict(values) for name, values in consumers.items()},
+    }
+
+
+def to_json(artifact):
+    return json.dumps(artifact, indent=2) + "\n"
+
+
+def to_shell(artifact):
+    """theme.sh: THEME_<TOKEN> and THEME_<TOKEN>_ARGB, then <CONSUMER>_<NAME>."""
+    lines = [
+        "# Generated by reload-theme, do not edit",
+        f"export THEME_VERSION={artifact['version']}",
+        f"export THEME_SOURCE_MTIME_NS={artifact['source_mtime_ns']}",
+    ]
+    for name, forms in artifact["tokens"].items():
+        variable = f"THEME_{name.upper()}"
+        lines.append(f"export {variable}={shlex.quote(forms['hex'])}")
+        lines.append(f"export {variable}_ARGB={forms['argb']}")
+    for consumer, values in artifact["consumers"].items():
+        for name, value in values.items():
+            lines.append(
+                f"export {consumer.upper()}_{name.upper()}={shlex.quote(value)}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def load(path=ARTIFACT_FILE):
+    """The artifact dict, or None if it's missing, malformed or another version."""
+    try:
+        with open(path) as f:
+            artifact = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(artifact, dict) or artifact.get("version") != VERSION:
+        return None
+    return artifact
@@ -0,0 +1,172 @@
+"""Perceptual color math: sRGB <-> linear light <-> OKLab/OKLCH.
+
+Channel decoding goes through a 256-entry table and encoding through a binary
+search over the same table's midpoints, so a round trip costs a couple of
+lookups plus the two 3x3 matrix products OKLab needs.
+"""
+
+import math
+from bisect import bisect
+from functools import lru_cache
+
+
+def _decode(channel):
+    c = channel / 255
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+# Byte -> linear light
+SRGB_TO_LINEAR = [_decode(i) for i in range(256)]
+
+# Linear light -> nearest byte: bisect these halfway points between table entries
+_MIDPOINTS = [(a + b) / 2 for a, b in zip(SRGB_TO_LINEAR, SRGB_TO_LINEAR[1:])]
+
+
+def to_linear(rgb):
+    return tuple(SRGB_TO_LINEAR[c] for c in rgb)
+
+
+def from_linear(linear):
+    """Linear light back to 8-bit sRGB, clipped to the gamut."""
+    return tuple(bisect(_MIDPOINTS, c) for c in linear)
+
+
+# Björn Ottosson's OKLab matrices: linear sRGB -> LMS, cube root, -> Lab
+RGB_TO_LMS = (
+    (0.4122214708, 0.5363325363, 0.0514459929),
+    (0.2119034982, 0.6806995451, 0.1073969566),
+    (0.0883024619, 0.2817188376, 0.6299787005),
+)
+LMS_TO_OKLAB = (
+    (0.2104542553, 0.7936177850, -0.0040720468),
+    (1.9779984951, -2.4285922050, 0.4505937099),
+    (0.0259040371, 0.7827717662, -0.8086757660),
+)
+OKLAB_TO_LMS = (
+    (1.0, 0.3963377774, 0.2158037573),
+    (1.0, -0.1055613458, -0.0638541728),
+    (1.0, -0.0894841775, -1.2914855480),
+)
+LMS_TO_RGB = (
+    (4.0767416621, -3.3077115913, 0.2309699292),
+    (-1.2684380046, 2.6097574011, -0.3413193965),
+    (-0.0041960863, -0.7034186147, 1.7076147010),
+)
+
+
+def _mul(matrix, vector):
+    x, y, z = vector
+    (a0, a1, a2), (b0, b1, b2), (c0, c1, c2) = matrix
+    return (
+        a0 * x + a1 * y + a2 * z,
+        b0 * x + b1 * y + b2 * z,
+        c0 * x + c1 * y + c2 * z,
+    )
+
+
+@lru_cache(maxsize=1024)
+def to_oklab(rgb):
+    l, m, s = _mul(RGB_TO_LMS, to_linear(rgb))
+    return _mul(LMS_TO_OKLAB, (l ** (1 / 3), m ** (1 / 3), s ** (1 / 3)))
+
+
+def _oklab_to_linear(lab):
+    l, m, s = _mul(OKLAB_TO_LMS, lab)
+    return _mul(LMS_TO_RGB, (l * l * l, m * m * m, s * s * s))
+
+
+def from_oklab(lab):
+    return from_linear(_oklab_to_linear(lab))
+
+
+def to_oklch(rgb):
+    L, a, b = to_oklab(rgb)
+    return L, math.hypot(a, b), math.atan2(b, a)
+
+
+def _in_gamut(linear):
+    return all(-1e-6 <= c <= 1 + 1e-6 for c in linear)
+
+
+def from_oklch(lch):
+    """8-bit sRGB for an OKLCH color; out-of-gamut colors lose chroma, not hue."""
+    L, C, h = lch
+    if L <= 0.0 or L >= 1.0:
+        # Black and white have no chroma to keep
+        C = 0.0
+    cos_h, sin_h = math.cos(h), math.sin(h)
+    linear = _oklab_to_linear((L, C * cos_h, C * sin_h))
+    if not _in_gamut(linear):
+        low, high = 0.0, C
+        for _ in range(12):
+            middle = (low + high) / 2
+            if _in_gamut(_oklab_to_linear((L, middle * cos_h, middle * sin_h))):
+                low = middle
+            else:
+                high = middle
+        linear = _oklab_to_linear((L, low * cos_h, low * sin_h))
+    return from_linear(linear)
+
+
+def relative_luminance(rgb):
+    """WCAG relative luminance."""
+    r, g, b = to_linear(rgb)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def contrast_ratio(rgb1, rgb2):
+    """WCAG contrast ratio, 1.0 to 21.0."""
+    y1, y2 = sorted((relative_luminance(rgb1), relative_luminance(rgb2)))
+    return (y2 + 0.05) / (y1 + 0.05)
+
+
+# Operations on 8-bit RGB tuples; lightness and chroma are changed in OKLCH so
+# hue stays put.
+
+
+@lru_cache(maxsize=1024)
+def lighten(rgb, amount):
+    """Move perceptual lightness toward white by a fraction (0.0 to 1.0)."""
+    L, C, h = to_oklch(rgb)
+    return from_oklch((L + (1 - L) * amount, C, h))
+
+
+@lru_cache(maxsize=1024)
+def darken(rgb, amount):
+    """Move perceptual lightness toward black by a fraction (0.0 to 1.0)."""
+    L, C, h = to_oklch(rgb)
+    return from_oklch((L * (1 - amount), C, h))
+
+
+@lru_cache(maxsize=1024)
+def saturate(rgb, amount):
+    """Scale chroma by 1 + amount; -1.0 gives the gray of equal lightness."""
+    L, C, h = to_oklch(rgb)
+    return from_oklch((L, max(0.0, C * (1 + amount)), h))
+
+
+@lru_cache(maxsize=1024)
+def contrast(rgb, against, ratio):
+    """rgb with its lightness pushed away from against until the WCAG ratio is met.
+
+    Goes lighter or darker, whichever side of against can reach the ratio (or
+    gets closest); hue and chroma are kept.
+    """
+    if contrast_ratio(rgb, against) >= ratio:
+        return rgb
+
+    L, C, h = to_oklch(rgb)
+    lighter = to_oklab(against)[0] < 0.5
+    if contrast_ratio((255, 255, 255) if lighter else (0, 0, 0), against) < ratio:
+        lighter = not lighter
+
+    # Bisect between the current lightness and white/black for the closest match
+    low, high = (L, 1.0) if lighter else (0.0, L)
+    for _ in range(16):
+        middle = (low + high) / 2
+        reached = contrast_ratio(from_oklch((middle, C, h)), against) >= ratio
+        if reached == lighter:
+            high = middle
+        else:
+            low = middle
+    return from_oklch((high if lighter else low, C, h))
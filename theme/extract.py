@@ -0,0 +1,391 @@
+"""Built-in wallpaper palette extraction, producing pywal's colors.json schema.
+
+Images are decoded downsampled: Pillow's draft mode when it's installed, macOS
+`sips` otherwise, and a pure-Python PNG decoder that walks the image one
+scanline at a time as a last resort. That decoder gives up on images it
+can't get through in a fraction of a second, so pywal handles those instead.
+The palette comes from a median cut over the sampled pixels, vectorized with
+NumPy when available.
+"""
+
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+import zlib
+from itertools import accumulate
+from pathlib import Path
+
+from . import trace
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Bumped whenever extraction output changes, so cached palettes are redone
+VERSION = "1"
+
+# Longest side of the image after downsampling
+SAMPLE_SIZE = 64
+
+# Seconds the pure-Python PNG decoder gets before giving up; large images
+# with Sub/Average/Paeth-filtered rows would otherwise take it many seconds
+PURE_PYTHON_BUDGET = 0.25
+
+
+class UnsupportedImage(Exception):
+    pass
+
+
+@trace.traced
+def extract_colors(image_path, sample_size=SAMPLE_SIZE, budget=PURE_PYTHON_BUDGET):
+    """Return pywal's colors.json dict for image_path.
+
+    budget limits the pure-Python PNG decoder (None for no limit, e.g. when
+    there's no pywal to fall back on).
+    """
+    pixels = sample_pixels(Path(image_path), sample_size, budget)
+    if not pixels:
+        raise UnsupportedImage(f"no pixels decoded from {image_path}")
+
+    colors = sorted(median_cut(pixels, 16), key=luminance)
+    return wal_schema(adjust(colors), Path(image_path).resolve())
+
+
+# Decoding
+
+
+@trace.traced
+def sample_pixels(path, sample_size, budget=PURE_PYTHON_BUDGET):
+    """Decode path down to at most sample_size on its longest side, as RGB tuples.
+
+    Raises UnsupportedImage for anything the decoder can't read, corrupt files
+    included, so the caller can fall back to pywal.
+    """
+    if Image is not None:
+        try:
+            return sample_with_pillow(path, sample_size)
+        except (OSError, Image.DecompressionBombError) as e:
+            raise UnsupportedImage(f"Pillow can't read {path.name}: {e}") from e
+    if shutil.which("sips"):
+        try:
+            return sample_with_sips(path, sample_size)
+        except (struct.error, IndexError) as e:
+            raise UnsupportedImage(f"unreadable BMP from sips: {e}") from e
+    if path.suffix.lower() == ".png":
+        try:
+            return sample_png(path, sample_size, budget)
+        except (zlib.error, struct.error, IndexError, TypeError) as e:
+            # A truncated header, corrupt image data or a bad/missing palette
+            raise UnsupportedImage(f"{path.name} is not a valid PNG: {e}") from e
+    raise UnsupportedImage(f"can't decode {path.name} without Pillow or sips")
+
+
+def sample_with_pillow(path, sample_size):
+    with Image.open(path) as image:
+        # JPEG decodes straight to a 1/2, 1/4 or 1/8 scale via DCT scaling
+        image.draft("RGB", (sample_size, sample_size))
+        image = image.convert("RGB")
+        image.thumbnail((sample_size, sample_size))
+        return list(image.getdata())
+
+
+def sample_with_sips(path, sample_size):
+    with tempfile.TemporaryDirectory(prefix="reload-theme-") as tmp_dir:
+        bmp_path = Path(tmp_dir) / "sample.bmp"
+        argv = [
+            "sips",
+            "-s",
+            "format",
+            "bmp",
+            "-Z",
+            str(sample_size),
+            str(path),
+            "--out",
+            str(bmp_path),
+        ]
+        with trace.span("sips", "subprocess", argv=argv):
+            result = subprocess.run(argv, capture_output=True)
+        if result.returncode != 0 or not bmp_path.exists():
+            raise UnsupportedImage(f"sips could not convert {path.name}")
+        return read_bmp(bmp_path.read_bytes())
+
+
+def read_bmp(data):
+    """Pixels of an uncompressed 24/32-bit BMP (what sips writes)."""
+    if data[:2] != b"BM":
+        raise UnsupportedImage("not a BMP file")
+
+    offset = struct.unpack_from("<I", data, 10)[0]
+    width, height, _, bpp, compression = struct.unpack_from("<iiHHI", data, 18)
+    if bpp not in (24, 32) or compression not in (0, 3):
+        raise UnsupportedImage(
+            f"unsupported BMP ({bpp} bpp, compression {compression})"
+        )
+
+    if compression == 3:
+        masks = struct.unpack_from("<III", data, 54)
+    else:
+        masks = (0xFF0000, 0x00FF00, 0x0000FF)
+    shifts = [(mask & -mask).bit_length() - 1 for mask in masks]
+
+    bytes_per_pixel = bpp // 8
+    stride = (width * bytes_per_pixel + 3) & ~3
+    pixels = []
+    for row in range(abs(height)):
+        start = offset + row * stride
+        for x in range(width):
+            i = start + x * bytes_per_pixel
+            value = int.from_bytes(data[i : i + bytes_per_pixel], "little")
+            pixels.append(
+                tuple((value & mask) >> shift for mask, shift in zip(masks, shifts))
+            )
+    return pixels
+
+
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def png_chunks(f):
+    if f.read(8) != b"\x89PNG\r\n\x1a\n":
+        raise UnsupportedImage("not a PNG file")
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        length, kind = struct.unpack(">I4s", header)
+        data = f.read(length)
+        f.read(4)  # CRC
+        yield kind, data
+        if kind == b"IEND":
+            return
+
+
+def sample_png(path, sample_size, budget=None):
+    """Stream a PNG scanline by scanline, keeping only every step-th row and column.
+
+    Memory stays at two scanlines plus the samples, whatever the image size.
+    Raises UnsupportedImage if decoding takes longer than budget seconds.
+    """
+    deadline = None if budget is None else time.perf_counter() + budget
+    with open(path, "rb") as f:
+        chunks = png_chunks(f)
+        kind, header = next(chunks, (None, b""))
+        if kind != b"IHDR":
+            raise UnsupportedImage("PNG is missing IHDR")
+        width, height, depth, color_type, _, _, interlace = struct.unpack(
+            ">IIBBBBB", header
+        )
+        if interlace or depth not in (8, 16) or color_type not in PNG_CHANNELS:
+            raise UnsupportedImage("unsupported PNG layout")
+
+        channels = PNG_CHANNELS[color_type]
+        bpp = channels * depth // 8
+        stride = width * bpp
+        step = max(1, -(-max(width, height) // sample_size))
+
+        palette = None
+        decompressor = zlib.decompressobj()
+        pending = b""
+        previous = bytearray(stride)
+        row_index = 0
+        pixels = []
+
+        for kind, data in chunks:
+            if kind == b"PLTE":
+                palette = [tuple(data[i : i + 3]) for i in range(0, len(data), 3)]
+                continue
+            if kind != b"IDAT":
+                continue
+
+            pending += decompressor.decompress(data)
+            position = 0
+            while len(pending) - position > stride and row_index < height:
+                filter_type = pending[position]
+                raw = pending[position + 1 : position + 1 + stride]
+                position += stride + 1
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise UnsupportedImage(
+                        f"{path.name} is too slow to decode without Pillow or sips"
+                    )
+                previous = unfilter(filter_type, raw, previous, bpp)
+
+                if row_index % step == 0:
+                    for x in range(0, width, step):
+                        i = x * bpp
+                        pixel = previous[i : i + bpp : depth // 8]
+                        if color_type == 3:
+                            pixels.append(palette[pixel[0]])
+                        elif channels <= 2:
+                            pixels.append((pixel[0],) * 3)
+                        else:
+                            pixels.append(tuple(pixel[:3]))
+                row_index += 1
+            pending = pending[position:]
+
+        return pixels
+
+
+def add_bytes(a, b):
+    """Bytewise (a + b) mod 256 as big-int arithmetic instead of a Python loop."""
+    size = len(a)
+    low = bytes([0x7F]) * size
+    high = bytes([0x80]) * size
+    x = int.from_bytes(a, "little")
+    y = int.from_bytes(b, "little")
+    mask_low = int.from_bytes(low, "little")
+    mask_high = int.from_bytes(high, "little")
+    total = ((x & mask_low) + (y & mask_low)) ^ ((x ^ y) & mask_high)
+    return bytearray(total.to_bytes(size, "little"))
+
+
+def unfilter(filter_type, raw, previous, bpp):
+    row = bytearray(raw)
+    if filter_type == 0:
+        return row
+    if filter_type == 2:
+        return add_bytes(row, previous)
+    if filter_type == 1:
+        # Sub is a running sum per channel
+        for channel in range(bpp):
+            row[channel::bpp] = bytes(
+                accumulate(row[channel::bpp], lambda a, b: (a + b) & 0xFF)
+            )
+        return row
+
+    for i in range(len(row)):
+        left = row[i - bpp] if i >= bpp else 0
+        up = previous[i]
+        if filter_type == 3:
+            row[i] = (row[i] + (left + up) // 2) & 0xFF
+        elif filter_type == 4:
+            up_left = previous[i - bpp] if i >= bpp else 0
+            p = left + up - up_left
+            pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+            if pa <= pb and pa <= pc:
+                predictor = left
+            elif pb <= pc:
+                predictor = up
+            else:
+                predictor = up_left
+            row[i] = (row[i] + predictor) & 0xFF
+        else:
+            raise UnsupportedImage(f"bad PNG filter type {filter_type}")
+    return row
+
+
+# Quantization
+
+
+def median_cut(pixels, count):
+    """Split the pixel cloud into count boxes; returns each box's mean color."""
+    if np is not None:
+        return median_cut_numpy(pixels, count)
+
+    boxes = [list(pixels)]
+    while len(boxes) < count:
+        box, channel = widest_box(boxes)
+        if box is None:
+            break
+        boxes.remove(box)
+        box.sort(key=lambda pixel: pixel[channel])
+        middle = len(box) // 2
+        boxes += [box[:middle], box[middle:]]
+
+    return pad([mean_color(box) for box in boxes], count)
+
+
+def widest_box(boxes):
+    """The splittable box with the largest channel range, and that channel."""
+    best, best_channel, best_range = None, 0, -1
+    for box in boxes:
+        if len(box) < 2:
+            continue
+        for channel in range(3):
+            values = [pixel[channel] for pixel in box]
+            spread = max(values) - min(values)
+            if spread > best_range:
+                best, best_channel, best_range = box, channel, spread
+    return best, best_channel
+
+
+def mean_color(box):
+    return tuple(sum(pixel[c] for pixel in box) // len(box) for c in range(3))
+
+
+def median_cut_numpy(pixels, count):
+    boxes = [np.asarray(pixels, dtype=np.int32)]
+    while len(boxes) < count:
+        candidates = [
+            (int(spread.max()), index, int(spread.argmax()))
+            for index, box in enumerate(boxes)
+            if len(box) >= 2
+            for spread in [box.max(axis=0) - box.min(axis=0)]
+        ]
+        if not candidates:
+            break
+        # Highest spread wins, ties go to the earliest box like the pure-Python path
+        _, index, channel = max(candidates, key=lambda c: (c[0], -c[1]))
+        box = boxes.pop(index)
+        box = box[np.argsort(box[:, channel], kind="stable")]
+        middle = len(box) // 2
+        boxes += [box[:middle], box[middle:]]
+
+    return pad(
+        [tuple(int(c) for c in box.sum(axis=0) // len(box)) for box in boxes], count
+    )
+
+
+def pad(colors, count):
+    """Images with few distinct colors can yield fewer boxes than asked for."""
+    while len(colors) < count:
+        colors.append(colors[len(colors) % max(1, len(colors))])
+    return colors
+
+
+# pywal-style adjustment
+
+
+def luminance(rgb):
+    r, g, b = rgb
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def darken(rgb, amount):
+    return tuple(int(c * (1 - amount)) for c in rgb)
+
+
+def blend(rgb1, rgb2):
+    return tuple((a + b) // 2 for a, b in zip(rgb1, rgb2))
+
+
+def adjust(colors):
+    """Arrange 16 luminance-sorted colors the way pywal's wal backend does."""
+    raw = colors[:1] + colors[8:16] + colors[8:-1]
+    if luminance(raw[0]) > 16:
+        raw[0] = darken(raw[0], 0.40)
+    raw[7] = blend(raw[7], (0xEE, 0xEE, 0xEE))
+    raw[8] = darken(raw[7], 0.30)
+    raw[15] = blend(raw[15], (0xEE, 0xEE, 0xEE))
+    return raw
+
+
+def wal_schema(colors, wallpaper):
+    hex_colors = ["#{:02x}{:02x}{:02x}".format(*rgb) for rgb in colors]
+    return {
+        "wallpaper": str(wallpaper),
+        "alpha": "100",
+        "special": {
+            "background": hex_colors[0],
+            "foreground": hex_colors[15],
+            "cursor": hex_colors[15],
+        },
+        "colors": {f"color{i}": value for i, value in enumerate(hex_colors)},
+    }
@@ -0,0 +1,168 @@
+"""In-place edits of JSON-with-comments settings files (VSCode, Zed).
+
+The document is tokenized lazily up to the member being changed and only that
+member's value span is rewritten, so comments, trailing commas and the
+formatting of everything else survive byte for byte.
+"""
+
+import json
+import re
+
+TOKEN = re.compile(
+    r"""
+    (?P<skip>(?:\s+|//[^\n]*|/\*.*?\*/)+)
+    | (?P<string>"(?:[^"\\]|\\.)*")
+    | (?P<punct>[{}\[\]:,])
+    | (?P<literal>[^\s{}\[\]:,"/]+)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Everything inside a container up to the next bracket or comment, in one match
+BULK = re.compile(r'(?:[^"{}\[\]/]+|"(?:[^"\\]|\\.)*"|/(?![/*]))*', re.DOTALL)
+COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+
+INDENT = re.compile(r"\n([ \t]+)[\"/]")
+
+
+class JSONCError(ValueError):
+    pass
+
+
+def tokens(text, pos=0):
+    """Yield (kind, start, end); kind is "string", "literal" or the punctuation."""
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if match is None:
+            raise JSONCError(f"unexpected {text[pos]!r} at offset {pos}")
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "skip":
+            continue
+        if kind == "punct":
+            kind = match.group()
+        yield kind, match.start(), pos
+
+
+def skip_container(text, pos):
+    """Offset just past the bracket closing the container opened before pos.
+
+    Strings and plain members are jumped over by the regex engine, so only
+    brackets and comments cost a Python iteration.
+    """
+    depth = 1
+    while depth:
+        pos = BULK.match(text, pos).end()
+        if pos >= len(text):
+            raise JSONCError("unexpected end of document")
+        char = text[pos]
+        if char in "{[":
+            depth += 1
+            pos += 1
+        elif char in "}]":
+            depth -= 1
+            pos += 1
+        else:
+            match = COMMENT.match(text, pos)
+            if match is None:
+                raise JSONCError(f"unterminated string or comment at offset {pos}")
+            pos = match.end()
+    return pos
+
+
+def locate(text, path):
+    """Find the deepest existing member along path.
+
+    Returns (depth, start, end, empty): when depth == len(path), start:end is the
+    value of path; when a member exists but isn't an object, start:end is its
+    value; otherwise start is the offset just past the '{' of the object that
+    lacks path[depth], and empty says whether that object has no members yet.
+    """
+    stream = tokens(text)
+    try:
+        kind, _, end = next(stream)
+        if kind != "{":
+            raise JSONCError("settings root is not an object")
+
+        for depth, key in enumerate(path):
+            object_start, empty = end, True
+            while True:
+                kind, start, end = next(stream)
+                if kind == "}":
+                    return depth, object_start, object_start, empty
+                if kind == ",":
+                    continue
+                if kind != "string":
+                    raise JSONCError(f"expected a member name at offset {start}")
+                empty = False
+                name = json.loads(text[start:end])
+                if next(stream)[0] != ":":
+                    raise JSONCError(f"expected ':' after {name!r}")
+
+                kind, value_start, end = next(stream)
+                descend = name == key and kind == "{" and depth + 1 < len(path)
+                if descend:
+                    break
+                if kind in ("{", "["):
+                    end = skip_container(text, end)
+                    stream = tokens(text, end)
+                if name == key:
+                    return depth + 1, value_start, end, False
+    except StopIteration:
+        raise JSONCError("unexpected end of document") from None
+
+
+def line_indent(text, offset):
+    line_start = text.rfind("\n", 0, offset) + 1
+    prefix = text[line_start:offset]
+    return prefix[: len(prefix) - len(prefix.lstrip())]
+
+
+def indent_unit(text):
+    match = INDENT.search(text)
+    return match.group(1) if match else "    "
+
+
+def nest(keys, value_text):
+    """JSON text for {keys[0]: {keys[1]: ... value_text}}."""
+    for key in reversed(keys):
+        value_text = "{%s: %s}" % (json.dumps(key), value_text)
+    return value_text
+
+
+def set_value(text, path, value_text):
+    """Return text with the member at path (a list of keys) set to value_text.
+
+    value_text is JSON text; its continuation lines are indented to sit under
+    the member. Missing members are added as the first member of their object.
+    """
+    if not text.strip():
+        text = "{}"
+    value_text = value_text.strip()
+    depth, start, end, empty = locate(text, path)
+    unit = indent_unit(text)
+
+    if depth == len(path):
+        indent = line_indent(text, start)
+        return text[:start] + value_text.replace("\n", "\n" + indent) + text[end:]
+
+    if end > start:
+        # path[depth - 1] holds a string/number/array; replace it with an object
+        indent = line_indent(text, start)
+        value = nest(path[depth:], value_text).replace("\n", "\n" + indent)
+        return text[:start] + value + text[end:]
+
+    outer = line_indent(text, start - 1)
+    indent = outer + unit
+    member = "\n%s%s: %s" % (
+        indent,
+        json.dumps(path[depth]),
+        nest(path[depth + 1 :], value_text).replace("\n", "\n" + indent),
+    )
+    if empty:
+        close = text.index("}", start)
+        if not text[start:close].strip():
+            return text[:start] + member + "\n" + outer + text[close:]
+        # Only comments inside: keep them after the new member
+        return text[:start] + member + text[start:]
+    return text[:start] + member + "," + text[start:]
@@ -0,0 +1,119 @@
+"""Pywal palette parsed once, with every derived color computed in one pass."""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from . import trace
+from .colorspace import darken, lighten
+
+COLORS_FILE = Path.home() / ".cache" / "wal" / "colors.json"
+
+# Derived tokens in dependency order: name -> (operation, *inputs).
+# String inputs name earlier tokens, numbers are passed through as-is.
+# lighten/darken work in OKLCH (see colorspace.py), so the light and dim
+# tones keep the hue of the color they're derived from.
+DERIVED = {
+    # Base semantic colors
+    "bg": ("alias", "background"),
+    "fg": ("alias", "foreground"),
+    "accent": ("alias", "color1"),
+    "icon": ("alias", "color4"),
+    "label": ("alias", "color6"),
+    "selection_bg": ("lighten", "bg", 0.25),
+    # Background variations for visual hierarchy
+    "bg_elevated": ("lighten", "bg", 0.08),  # Panels, sidebars
+    "bg_surface": ("lighten", "bg", 0.04),  # Tab bar, status bar
+    "bg_active": ("lighten", "bg", 0.12),  # Active tab, active line
+    # Keywords family (accent-based tones)
+    "keyword": ("alias", "color1"),
+    "keyword_light": ("lighten", "color1", 0.15),
+    "keyword_dim": ("darken", "color1", 0.2),
+    # String family (color2-based tones)
+    "string": ("alias", "color2"),
+    "string_light": ("lighten", "color2", 0.2),
+    "string_dim": ("darken", "color2", 0.15),
+    # Function family (color3-based tones)
+    "function": ("alias", "color3"),
+    "function_light": ("lighten", "color3", 0.15),
+    "function_dim": ("darken", "color3", 0.2),
+    # Type family (color4-based tones)
+    "type": ("alias", "color4"),
+    "type_light": ("lighten", "color4", 0.15),
+    "type_dim": ("darken", "color4", 0.2),
+    # Neutral tones for punctuation and operators
+    "punctuation": ("blend", "color8", "label", 0.3),
+    "operator": ("blend", "label", "color3", 0.25),
+    "bracket": ("blend", "color8", "label", 0.5),
+    # Comment tones
+    "comment": ("alias", "color8"),
+    "comment_doc": ("lighten", "color8", 0.15),
+    # Variable tones
+    "variable": ("alias", "label"),
+    "variable_special": ("blend", "label", "color5", 0.3),
+    "parameter": ("blend", "label", "color4", 0.2),
+    # Property and attribute tones
+    "property": ("blend", "label", "color6", 0.4),
+    "attribute": ("blend", "color4", "color6", 0.4),
+}
+
+
+def parse_hex(hex_color):
+    hex_color = hex_color.lstrip("#")
+    return (
+        int(hex_color[0:2], 16),
+        int(hex_color[2:4], 16),
+        int(hex_color[4:6], 16),
+    )
+
+
+def to_hex(rgb):
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+
+@lru_cache(maxsize=1024)
+def blend(rgb1, rgb2, ratio=0.5):
+    """Blend two colors together. ratio=0 gives rgb1, ratio=1 gives rgb2."""
+    return tuple(int(a + (b - a) * ratio) for a, b in zip(rgb1, rgb2))
+
+
+OPERATIONS = {
+    "alias": lambda rgb: rgb,
+    "lighten": lighten,
+    "darken": darken,
+    "blend": blend,
+}
+
+
+class Palette:
+    """A pywal palette plus all derived tokens, as RGB tuples and hex strings."""
+
+    def __init__(self, wal_colors):
+        self.wal = wal_colors
+        self.rgb = {
+            name: parse_hex(value)
+            for name, value in {**wal_colors["special"], **wal_colors["colors"]}.items()
+        }
+
+        for name, (operation, *inputs) in DERIVED.items():
+            args = [self.rgb[arg] if isinstance(arg, str) else arg for arg in inputs]
+            self.rgb[name] = OPERATIONS[operation](*args)
+
+        self.hex = {name: to_hex(rgb) for name, rgb in self.rgb.items()}
+
+    @classmethod
+    def load(cls, path=COLORS_FILE):
+        """Parse a pywal colors.json; returns None if it's missing or malformed."""
+        try:
+            with trace.span("palette.load", "io", path=str(path)):
+                with open(path) as f:
+                    return cls(json.load(f))
+        except (OSError, json.JSONDecodeError, KeyError, ValueError):
+            return None
+
+    def __getitem__(self, name):
+        return self.hex[name]
+
+    def argb(self, name, alpha=0xFF):
+        """Token in SketchyBar/borders notation, e.g. 0xff1e3a5f."""
+        return "0x{:02x}{:02x}{:02x}{:02x}".format(alpha, *self.rgb[name])
@@ -0,0 +1,71 @@
+"""Static theme templates with {{token}} slots, compiled to %-format strings."""
+
+import json
+import os
+import re
+from pathlib import Path
+
+from . import trace
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+COMPILED_DIR = Path.home() / ".cache" / "reload-theme" / "templates"
+
+SLOT = re.compile(r"\{\{(\w+)\}\}")
+
+_compiled = {}
+
+
+class Template:
+    """A template compiled once so rendering is a single substitution pass."""
+
+    def __init__(self, name, format_string, slots):
+        self.name = name
+        self.format_string = format_string
+        self.slots = frozenset(slots)
+
+    @classmethod
+    def compile(cls, name, source):
+        format_string = SLOT.sub(r"%(\1)s", source.replace("%", "%%"))
+        return cls(name, format_string, SLOT.findall(source))
+
+    def render(self, tokens):
+        """Fill every slot from tokens, a mapping of token name -> value."""
+        with trace.span("template.render", "function", template=self.name):
+            return self.format_string % tokens
+
+
+def load_template(name):
+    """Template `name` from memory, the on-disk compile cache, or its source."""
+    source_file = TEMPLATE_DIR / f"{name}.json"
+    stat = source_file.stat()
+    signature = [stat.st_mtime_ns, stat.st_size]
+
+    template = _compiled.get(name)
+    if template is not None and template[0] == signature:
+        return template[1]
+
+    compiled_file = COMPILED_DIR / f"{name}.json"
+    try:
+        with open(compiled_file) as f:
+            cached = json.load(f)
+        if cached["signature"] != signature:
+            raise ValueError("stale")
+        template = Template(name, cached["format"], cached["slots"])
+    except (OSError, ValueError, KeyError):
+        with trace.span("template.compile", "function", template=name):
+            template = Template.compile(name, source_file.read_text())
+        COMPILED_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = compiled_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(
+            json.dumps(
+                {
+                    "signature": signature,
+                    "format": template.format_string,
+                    "slots": sorted(template.slots),
+                }
+            )
+        )
+        os.replace(tmp_file, compiled_file)
+
+    _compiled[name] = (signature, template)
+    return template
@@ -0,0 +1,112 @@
+"""Chrome/Perfetto trace recording that costs a global lookup when switched off."""
+
+import functools
+import json
+import os
+import threading
+import time
+
+_events = None
+_thread_names = {}
+_lock = threading.Lock()
+_start_ns = 0
+
+
+def enable():
+    global _events, _start_ns
+    _events = []
+    _start_ns = time.perf_counter_ns()
+
+
+def enabled():
+    return _events is not None
+
+
+class Span:
+    """A complete ("X") trace event; args can be added while it's open."""
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.begin = time.perf_counter_ns()
+        return self
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        event = {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": (self.begin - _start_ns) / 1000,
+            "dur": (end - self.begin) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args,
+        }
+        with _lock:
+            _events.append(event)
+            _thread_names[event["tid"]] = threading.current_thread().name
+        return False
+
+
+class NullSpan:
+    """Stands in for Span when tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_OFF = NullSpan()
+
+
+def span(name, category="function", **args):
+    """Context manager timing a block; a shared no-op when tracing is off."""
+    if _events is None:
+        return _OFF
+    return Span(name, category, args)
+
+
+def traced(func):
+    """Record every call of func as a span named after it."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _events is None:
+            return func(*args, **kwargs)
+        with Span(func.__name__, "function", {}):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def write(path):
+    """Dump recorded events as a JSON trace loadable in Perfetto or chrome://tracing."""
+    with _lock:
+        events = list(_events or [])
+        thread_names = dict(_thread_names)
+
+    metadata = [
+        {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "tid": tid,
+            "args": {"name": thread_names.get(tid, f"thread-{tid}")},
+        }
+        for tid in sorted({event["tid"] for event in events})
+    ]
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)